@@ -0,0 +1,72 @@
+"""
+Benchmark of the compression of large messages on a slow link
+A throttling TCP proxy is put between python and the backend: it forwards data at a bounded rate.
+usage: python examples/bench_compression.py [conllu_file] [kbytes_per_second]
+"""
+import sys, os
+import socket
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join( os.path.dirname(__file__), "../"))) # Use local grew lib
+
+from grewpy import Corpus, set_compression
+from grewpy import network
+
+conll_file = sys.argv[1] if len(sys.argv) > 1 else "examples/resources/fr_pud-ud-test.conllu"
+rate = int(sys.argv[2]) * 1024 if len(sys.argv) > 2 else 1024 * 1024
+
+def forward(src, dst):
+    """
+    copy src to dst, at most rate bytes per second
+    """
+    chunk = max(1, rate // 100)
+    try:
+        while data := src.recv(chunk):
+            dst.sendall(data)
+            time.sleep(len(data) / rate)
+        dst.shutdown(socket.SHUT_WR)
+    except OSError:
+        pass
+
+def proxy(listener, backend):
+    """
+    accept connections on listener and forward them to backend, in both directions
+    """
+    while True:
+        client, _ = listener.accept()
+        server = socket.create_connection(backend)
+        for src, dst in ((client, server), (server, client)):
+            threading.Thread(target=forward, args=(src, dst), daemon=True).start()
+
+listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+listener.bind(("127.0.0.1", 0))
+listener.listen()
+threading.Thread(target=proxy, args=(listener, (network.remote_ip, network.port)), daemon=True).start()
+network.remote_ip, network.port = "127.0.0.1", listener.getsockname()[1]
+
+corpus = Corpus(conll_file)
+commands = {
+    "corpus_to_conll": corpus.to_conll,
+    "corpus_get_all": corpus.get_all,
+}
+
+def measure():
+    """
+    return the time (in seconds) of each command
+    """
+    times = dict()
+    for name, command in commands.items():
+        t = time.perf_counter()
+        command()
+        times[name] = time.perf_counter() - t
+    return times
+
+print(f"{conll_file}, link at {rate/1024:.0f} KiB/s")
+for methods in ([], ["zlib"], ["zstd"]):
+    method = set_compression(methods)
+    if methods and method is None:
+        print(f"{methods[0]:6}: not available")
+        continue
+    for name, t in measure().items():
+        print(f"{method or 'none':6} {name:16}: {t:8.3f} s")
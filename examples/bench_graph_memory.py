@@ -0,0 +1,37 @@
+"""
+Memory benchmark: dict-based Graph vs CompactGraph
+usage: python examples/bench_graph_memory.py [conllu_file] [nb_of_copies]
+"""
+import sys, os
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join( os.path.dirname(__file__), "../"))) # Use local grew lib
+
+from grewpy import Corpus, Graph, CompactGraph
+
+conll_file = sys.argv[1] if len(sys.argv) > 1 else "examples/resources/fr_pud-ud-test.conllu"
+copies = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+# raw json data of the graphs, fetched once from the backend
+raw = [g.json_data() for g in Corpus(conll_file).get_all().values()]
+
+def measure(graph_class):
+    """
+    return the memory (in bytes) retained by copies x |corpus| graphs of graph_class
+    """
+    tracemalloc.start()
+    graphs = [graph_class(features={n: dict(fs) for n, fs in js["nodes"].items()},
+                          sucs=Graph.from_json(js).sucs, order=list(js["order"]), meta=dict(js["meta"]))
+              for _ in range(copies) for js in raw]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del graphs
+    return size
+
+nb = copies * len(raw)
+dict_size = measure(Graph)
+compact_size = measure(CompactGraph)
+print(f"{nb} graphs from {conll_file}")
+print(f"Graph        : {dict_size/2**20:8.2f} MiB ({dict_size/nb:8.0f} bytes/graph)")
+print(f"CompactGraph : {compact_size/2**20:8.2f} MiB ({compact_size/nb:8.0f} bytes/graph)")
+print(f"ratio        : {dict_size/compact_size:8.2f}")
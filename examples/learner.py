@@ -209,8 +209,9 @@ def get_best_solution(corpus_gold, corpus_start, grs):
         return t[0]/math.sqrt((t[0]+t[1])*(t[0]*t[2])+1e-20)
 
     corpus_draft = CorpusDraft(corpus_start)
+    solutions = grs.run(corpus_start, 'main')
     for sid in corpus_gold:
-        gs = grs.run(corpus_start[sid], 'main')
+        gs = solutions[sid]
         best_fscore = 0
         for g in gs:
             fs = f_score(g.edge_diff_up_to(corpus_gold[sid], remove_rank))
@@ -286,9 +287,10 @@ def apply_sketches(sketches, corpus, param, rank_level):
     find rules from sketches
     """
     rules = WorkingGRS()
+    observations = Sketch.cluster_many(sketches, corpus)
     for sketch_name in sketches:
         sketch = sketches[sketch_name]
-        rules |= build_rules(sketch, sketch.cluster(corpus), param, sketch_name, rank_level=rank_level)
+        rules |= build_rules(sketch, observations[sketch_name], param, sketch_name, rank_level=rank_level)
     return rules
 
 def adjacent_rules(corpus: Corpus, param) -> WorkingGRS:
@@ -346,12 +348,13 @@ def rank_n_plus_one(corpus_gold, param, rank_n):
                 sketches[(ns,o,rank)] = Sketch(Request('X[];Y[]', ns, o, f'f.rank="{rank}"'), 
                 ["X.upos", "Y.upos"], edge_between_X_and_Y, no_edge_between_X_and_Y, "e.label")
     
+    observations = Sketch.cluster_many(sketches, corpus)
     cpt = 1
     for ns in nodes:
         for o in ordres:
             obs = Observation()
             for rank in range(0, rank_n+1):
-                obs |= sketches[(ns,o,rank)].cluster(corpus)
+                obs |= observations[(ns,o,rank)]
             rules |= build_rules(sketches[(ns,o,rank_n)], obs, param, f"rank_{rank_n}_{cpt}", 
             rank_level=rank_n+1)
             cpt += 1
@@ -363,7 +366,7 @@ def rule_analysis(Rs, DRs, corpus):
     """
     applications = CorpusDraft()
     for R in DRs.rules():
-        applications[R] = CorpusDraft({sid : Rs.run(corpus[sid], f'Onf({R})')[0] for sid in corpus})
+        applications[R] = CorpusDraft({sid : gs[0] for sid, gs in Rs.run(corpus, f'Onf({R})').items()})
     matrix = dict()
     for R in DRs.rules():
         for S in DRs.rules():
@@ -45,3 +45,9 @@ g1.sucs['C'] = []
 
 print ("---- JSON output of a graph ----")
 print (json.dumps(g1.json_data(), indent=4))
+
+print ("---- compact (read-only) version of a graph ----")
+cg = g1.compact()
+print (f"|nodes| = {len(cg)}")
+print (cg.sucs["A"])
+print (json.dumps(cg.json_data(), indent=4))
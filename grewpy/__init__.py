@@ -4,9 +4,9 @@ All you need to use grew
 See grew online documentation for global informations
 """
 from .corpus import CorpusDraft, Corpus
-from .grs import Request, GRSDraft, Package, Rule, Commands, GRS, Add_edge, Delete_edge
-from .graph import Graph
-from .grew import set_config, request_counter
+from .grs import Request, CompiledRequest, GRSDraft, Package, Rule, Commands, GRS, Add_edge, Delete_edge
+from .graph import Graph, CompactGraph
+from .grew import set_config, set_compression, request_counter, live_objects
 
 from .network import init
 init()
\ No newline at end of file
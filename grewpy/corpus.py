@@ -8,17 +8,29 @@ import sys
 import tempfile
 import json
 import typing
+import weakref
+import random
+import time
 import numpy as np
 
 from .network import send_and_receive
-from .graph import Graph
+from .graph import Graph, CompactGraph, _Compact_pool
+from . import grew
 from .grew import GrewError
 from .observation import Observation
+from .utils import estimate
+from .index import CorpusIndex
 from . import network
 
 from .matchings import Matchings
 
 class AbstractCorpus():
+    def get_many(self, sent_ids):
+        """
+        return a dict mapping each sentence id in sent_ids to its graph
+        """
+        return {sid: self[sid] for sid in sent_ids}
+
     def diff(self, other, edge_criterion=lambda e: True):
         """
         given two corpora, outputs the number of common edges, only left ones and only right ones
@@ -52,22 +64,35 @@ class AbstractCorpus():
             "f_measure": round(f_measure, 3),
         }
 
+def _select(matchings, sent_ids):
+    """
+    return the matchings (a list, or a nested dict of lists as given by corpus_search)
+    of the sentences in the set sent_ids; empty clusters are dropped
+    """
+    if isinstance(matchings, dict):
+        selected = {k: _select(v, sent_ids) for k, v in matchings.items()}
+        return {k: v for k, v in selected.items() if v}
+    return [m for m in matchings if m["sent_id"] in sent_ids]
+
 class CorpusDraft(AbstractCorpus,dict):
     """
     the draft is composed of 
       - self, a dict mapping sentence_id to graphs
       - self._sent_ids, a list that specifies the sentence order
     """
-    def __init__(self,data=None):
+    def __init__(self,data=None, compact=False):
         """Load a corpus from a file of a string
         :param data: a file, a list of files or a CoNLL string representation of a corpus
         :param local: state whether we load a local copy of each graph of the corpus
+        :param compact: when data is loaded from the backend, graphs are stored as CompactGraph
         :return: an integer index for latter reference to the corpus
         :raise an error if the files was not correctly loaded
         """
         if isinstance(data, CorpusDraft):
-            T = {sid: Graph(data[sid]) for sid in data}
+            T = {sid: graph.copy() for sid, graph in data.items()}
             super().__init__(T)
+            if hasattr(data, "_sent_ids"):
+                self._sent_ids = list(data._sent_ids)
         elif isinstance(data, dict):
             super().__init__(data)
         elif data == None:
@@ -75,7 +100,7 @@ class CorpusDraft(AbstractCorpus,dict):
         else:
             acorpus = data if isinstance(data, Corpus) else Corpus(data)
             self._sent_ids = acorpus.get_sent_ids() #specifies the sentences order
-            super().__init__(acorpus.get_all())
+            super().__init__(acorpus.get_all(compact))
 
     def __getitem__(self, data):
         """
@@ -97,29 +122,83 @@ class CorpusDraft(AbstractCorpus,dict):
         """
         return CorpusDraft({sid : fun(self[sid]) for sid in self})
 
+    def duplicates(self, meta=()):
+        """
+        return a dict mapping each sentence id whose graph is identical to a previous one
+        to the sentence id of its first occurrence
+        graphs are compared with Graph.fingerprint(meta)
+        """
+        sent_ids = self._sent_ids if hasattr(self, "_sent_ids") else list(self)
+        first, dups = dict(), dict()
+        for sid in sent_ids:
+            fp = dict.__getitem__(self, sid).fingerprint(meta)
+            if fp in first:
+                dups[sid] = first[fp]
+            else:
+                first[fp] = sid
+        return dups
+
+    def dedup(self, meta=()):
+        """
+        return a new CorpusDraft containing only the first occurrence of identical graphs
+        see duplicates
+        """
+        dups = self.duplicates(meta)
+        draft = CorpusDraft({sid: graph.copy() for sid, graph in self.items() if sid not in dups})
+        if hasattr(self, "_sent_ids"):
+            draft._sent_ids = [sid for sid in self._sent_ids if sid not in dups]
+        return draft
+
+    def to_arrays(self, vocabularies=None, one_hot=False):
+        """
+        return a numerical view of the corpus, see Graph.to_arrays
+        nodes of all graphs are concatenated, the graph of sentence id
+        "sent_ids"[k] owns the nodes "graph_ptr"[k] to "graph_ptr"[k+1]
+        all graphs share the same vocabularies
+        """
+        sent_ids = list(self._sent_ids) if hasattr(self, "_sent_ids") else list(self)
+        arrays = Graph._to_arrays((dict.__getitem__(self, sid) for sid in sent_ids), vocabularies, one_hot)
+        arrays["sent_ids"] = sent_ids
+        return arrays
+
+    def compact(self):
+        """
+        return a new CorpusDraft where graphs are stored as CompactGraph
+        they share their interned values, freed with the last of them
+        """
+        pool = _Compact_pool()
+        draft = self.apply(lambda g: g if isinstance(g, CompactGraph) else CompactGraph(g, pool))
+        if hasattr(self, "_sent_ids"):
+            draft._sent_ids = list(self._sent_ids)
+        return draft
+
 
 class Corpus(AbstractCorpus):
-    def __init__(self, data):
+    def __init__(self, data, batch_size=1000):
         """An abstract corpus
-        :param data: a file, a list of files or a CoNLL string representation of a corpus
+        :param data: a file, a list of files or a CoNLL string representation of a corpus,
+          or the graphs of the corpus: a list of graphs, a dict (or a CorpusDraft) or an iterable
+          of pairs (sent_id, graph)
         :param local: state whether we load a local copy of each graph of the corpus
+        :param batch_size: graphs are sent to the backend by batches of batch_size graphs
         :return: an integer index for latter reference to the corpus
         :raise an error if the files was not correctly loaded
         """
-        if isinstance(data, list):
-            if data and isinstance(data[0], Graph):
-                graphs = {f'{i}' : data[i].json_data() for i in range(len(data))}
-                req = {"command": "corpus_from_dict", "graphs": graphs}
-            else:
-                #supposed to be a list of files
-                req = {"command": "corpus_load", "files": data}
+        self._files = []
+        if isinstance(data, list) and not (data and isinstance(data[0], Graph)):
+            #supposed to be a list of files
+            req = {"command": "corpus_load", "files": data}
+            self._files = list(data)
             reply = network.send_and_receive(req)
+        elif isinstance(data, list):
+            reply = self._upload(((f'{i}', graph) for i, graph in enumerate(data)), batch_size)
         elif isinstance(data, dict):
-            req = {"command": "corpus_from_dict", "graphs": {
-                sent_id: graph.json_data() for (sent_id, graph) in data.items()}}
-            reply = network.send_and_receive(req)
+            reply = self._upload(data.items(), batch_size)
+        elif not isinstance(data, str):
+            reply = self._upload(data, batch_size)
         elif os.path.isfile(data):
             req = {"command": "corpus_load", "files": [data]}
+            self._files = [data]
             reply = network.send_and_receive(req)
         else:
             with tempfile.NamedTemporaryFile(mode="w", delete=True, suffix=".conll") as f:
@@ -132,6 +211,90 @@ class Corpus(AbstractCorpus):
                     raise GrewError(data)
         self._length = reply["length"]
         self._id = reply["index"]
+        grew._register("corpus", self._id, length=self._length)
+        self._finalizer = weakref.finalize(self, grew._free, "corpus", self._id)
+        self._finalizer.atexit = False # the backend stops with python
+        self._index = None
+        self._modified = None # time of the last modification of the graphs, see _rewritten
+        self.search_stats = dict()
+
+    @staticmethod
+    def _batches(items, batch_size):
+        """
+        yield the json data of the pairs (sent_id, graph) of items, by dicts of batch_size graphs
+        """
+        batch = dict()
+        for sent_id, graph in items:
+            batch[sent_id] = graph.json_data()
+            if len(batch) == batch_size:
+                yield batch
+                batch = dict()
+        if batch:
+            yield batch
+
+    def _upload(self, items, batch_size):
+        """
+        create the corpus with the first batch of items, and append the others to it
+        only one batch is kept in memory at a time
+        with a backend which does not know corpus_add_graphs, all graphs are sent at once
+        return the reply of the creation, with the final length
+        """
+        batches = Corpus._batches(items, batch_size)
+        first = next(batches, dict())
+        reply = network.send_and_receive({"command": "corpus_from_dict", "graphs": first})
+        for nb, batch in enumerate(batches):
+            try:
+                reply["length"] = network.send_and_receive({
+                    "command": "corpus_add_graphs",
+                    "corpus_index": reply["index"],
+                    "graphs": batch})["length"]
+            except GrewError:
+                if nb > 0:
+                    raise
+                grew._free("corpus", reply["index"])
+                for other in batches:
+                    batch.update(other)
+                return network.send_and_receive({"command": "corpus_from_dict", "graphs": {**first, **batch}})
+        return reply
+
+    def add_graphs(self, items, batch_size=1000):
+        """
+        append graphs to the corpus, sent to the backend by batches of batch_size graphs
+        :param items: a dict (or a CorpusDraft) or an iterable of pairs (sent_id, graph)
+        the index of the corpus, if any, is dropped (see _rewritten)
+        """
+        items = items.items() if isinstance(items, dict) else items
+        for batch in Corpus._batches(items, batch_size):
+            self._length = network.send_and_receive({
+                "command": "corpus_add_graphs",
+                "corpus_index": self._id,
+                "graphs": batch})["length"]
+        grew._register("corpus", self._id, length=self._length)
+        self._rewritten()
+
+    def _rewritten(self):
+        """
+        to be called when the graphs of the corpus are modified on the backend side:
+        the index is dropped, and an index persisted before is outdated
+        the corpus is no longer the content of its files, whose index is not used anymore
+        """
+        self._index = None
+        self._files = []
+        self._modified = time.time()
+
+    def close(self):
+        """
+        free the memory used by the corpus on the backend side
+        it is done automatically when the corpus is garbage collected
+        the corpus cannot be used afterwards
+        """
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
     def get_sent_ids(self):
         """
@@ -154,6 +317,22 @@ class Corpus(AbstractCorpus):
                    "corpus_index": self._id, "sent_id": sent_id}
         return (Graph.from_json(network.send_and_receive(req)))
     
+    def get_many(self, sent_ids):
+        """
+        return a dict mapping each sentence id in sent_ids to its graph
+        the distinct graphs are fetched in a single request (one request per graph
+        with a backend which does not know corpus_get_many)
+        """
+        sent_ids = list(dict.fromkeys(sent_ids))
+        try:
+            graphs = network.send_and_receive({
+                "command": "corpus_get_many",
+                "corpus_index": self._id,
+                "sent_ids": sent_ids})
+        except GrewError:
+            return {sid: self.get(sid) for sid in sent_ids}
+        return {sid: Graph.from_json(graphs[sid]) for sid in sent_ids}
+
     def __getitem__(self, data):
         """
         return a graph corresponding to data, either
@@ -171,56 +350,208 @@ class Corpus(AbstractCorpus):
             return [self[sid] for sid in sids[data]]
 
 
-    def get_all(self):
+    def get_all(self, compact=False):
         """
         return a dictionary mapping sentence ids to graphs
+        if compact, graphs are CompactGraph sharing their interned values, freed with the last of them
         """
         dico = network.send_and_receive({"command": "corpus_get_all", "corpus_index": self._id})
+        if compact:
+            pool = _Compact_pool()
+            return {sid: CompactGraph.from_json(json_data, pool) for (sid,json_data) in dico.items()}
         return {sid: Graph.from_json(json_data) for (sid,json_data) in dico.items() }
 
 
-    def search(self, request, clustering_parameter=[], clustering_keys=[],flat=None):
+    def build_index(self, path=None, rebuild=False):
+        """
+        build the inverted index of the corpus (see CorpusIndex), used afterwards by
+        search, count and search_iter to restrict the sentences given to the backend
+        The index is persisted in path (by default, alongside the corpus file, if any)
+        and loaded from there next time, unless it is outdated (other sentences, newer
+        corpus file, graphs rewritten since or other grew configuration) or rebuild is set.
+        :return: the index
+        """
+        path = path or CorpusIndex.default_path(self._files)
+        sent_ids = self.get_sent_ids()
+        config = json.dumps(grew.config, sort_keys=True)
+        index = None
+        if path and os.path.isfile(path) and not rebuild:
+            index = CorpusIndex.load(path)
+            mtime = os.path.getmtime(path)
+            if index.sent_ids != sent_ids or index.config != config \
+                or any(os.path.getmtime(f) > mtime for f in self._files) \
+                or (self._modified is not None and self._modified > mtime):
+                index = None
+        if index is None:
+            graphs = network.send_and_receive({"command": "corpus_get_all", "corpus_index": self._id})
+            index = CorpusIndex.from_json(sent_ids, graphs, config)
+            if path:
+                index.save(path)
+        self._index = index
+        return index
+
+    def _restrict(self, request, sent_ids):
+        """
+        return the sentences to search for request among sent_ids (None for all of them)
+        using the index if it is built, and update search_stats
+        """
+        index = self._index
+        if index is not None and index.config != json.dumps(grew.config, sort_keys=True):
+            index = None # built with another configuration
+        candidates = index.candidates(request) if index else None
+        if candidates is not None and sent_ids is not None:
+            candidates = set(candidates)
+            sent_ids = [sid for sid in sent_ids if sid in candidates]
+        elif candidates is not None:
+            sent_ids = candidates
+        self.search_stats = {
+            "index": index is not None,
+            "keys": CorpusIndex.request_keys(request, index.config) if index else [],
+            "sentences": len(self) if sent_ids is None else len(sent_ids),
+        }
+        return sent_ids
+
+    def search(self, request, clustering_parameter=[], clustering_keys=[],flat=None, sent_ids=None):
         """
         Search for [request] into [corpus_index]
 
         Parameters:
-        request (Request): a request
+        request (Request): a request or a CompiledRequest
         corpus_index: an integer given by the [corpus] function
+        sent_ids: if given, the search is restricted to these sentences
+        if the corpus is indexed (see build_index), only the candidate sentences are searched
+        and the size of the search is reported in self.search_stats
 
         Returns:
         list: the list of matching of [request] into the corpus
         """
-        res = network.send_and_receive({
-            "command": "corpus_search",
-            "corpus_index": self._id,
-            "request": request.json_data(),
-            "clustering_keys": clustering_parameter + clustering_keys
-        })
+        sent_ids = self._restrict(request, sent_ids)
+        res = self._search(request, clustering_parameter + clustering_keys, sent_ids)
         if flat == "matchings":
             return Matchings(res, self)
         elif flat == "observations" and clustering_parameter or clustering_keys:
             return Observation(res, clustering_parameter, clustering_keys)
         return res
 
-    def count(self, request, clustering_parameter=[], clustering_keys=[], flat=False):
+    def _search(self, request, clustering_keys, sent_ids, keep=None):
+        """
+        send the corpus_search request, restricted to sent_ids if not None
+        A backend which does not know the field sent_ids searches the whole corpus:
+        only the matchings in the sentences of keep (by default, sent_ids) are kept.
+        """
+        req = {
+            "command": "corpus_search",
+            "corpus_index": self._id,
+            **request._query(),
+            "clustering_keys": clustering_keys
+        }
+        if sent_ids is None:
+            return network.send_and_receive(req)
+        req["sent_ids"] = list(sent_ids)
+        return _select(network.send_and_receive(req), set(sent_ids) if keep is None else keep)
+
+    def search_iter(self, request, limit=None, chunk_size=1000):
+        """
+        iterate over the matchings of request in the corpus
+        The corpus is searched by chunks of chunk_size sentences, only when needed:
+        the search stops as soon as the iteration stops, or after limit matchings.
+        The candidate sentences are given by the index once (see search_stats).
+        With a backend which cannot restrict a search to some sentences, the first
+        search returns all the matchings, which are then given without further search.
+        """
+        if limit is not None and limit <= 0:
+            return
+        nb = 0
+        sent_ids = self._restrict(request, None)
+        if sent_ids is None:
+            sent_ids = self.get_sent_ids()
+        remaining = set(sent_ids)
+        for i in range(0, len(sent_ids), chunk_size):
+            chunk = sent_ids[i:i+chunk_size]
+            matchings = self._search(request, [], chunk, keep=remaining)
+            remaining.difference_update(chunk)
+            # matchings out of chunk: the backend ignored sent_ids and searched the whole corpus
+            whole = any(m["sent_id"] in remaining for m in matchings)
+            for matching in matchings:
+                yield matching
+                nb += 1
+                if nb == limit:
+                    return
+            if whole:
+                return
+
+    def search_sample(self, request, k, seed=None, chunk_size=1000):
+        """
+        return k matchings of request drawn uniformly at random (all of them if there are less than k)
+        the matchings are streamed with search_iter through a reservoir of size k,
+        hence the memory used does not depend on the number of matchings
+        """
+        rng = random.Random(seed)
+        reservoir = []
+        for i, matching in enumerate(self.search_iter(request, chunk_size=chunk_size)):
+            if i < k:
+                reservoir.append(matching)
+            else:
+                j = rng.randrange(i + 1)
+                if j < k:
+                    reservoir[j] = matching
+        return reservoir
+
+    def count(self, request, clustering_parameter=[], clustering_keys=[], flat=False, sent_ids=None, sample=None, seed=None, confidence=0.95):
         """
         Count for [request] into [corpus_index]
-        :param request: a string request
+        :param request: a Request or a CompiledRequest
         :param corpus_index: an integer given by the [corpus] function
+        :param sent_ids: if given, the count is restricted to these sentences
+        :param sample: if given, a fraction in (0,1]: only this fraction of the sentences,
+          drawn at random with seed, is searched and counts are scaled to the whole corpus;
+          each count is then an Estimate with its confidence interval [low, high]
+          (the matchings of the sample are fetched with search, to measure their spread over sentences)
         :return: the number of matching of [request] into the corpus
         """
-        res = network.send_and_receive({
-            "command": "corpus_count",
-            "corpus_index": self._id,
-            "request": request.json_data(),
-            "clustering_keys": clustering_parameter + clustering_keys,
-        })
+        if sample is not None and not 0 < sample <= 1:
+            raise ValueError(f"sample must be a fraction in (0,1], not {sample}")
+        if sample is not None and sample < 1:
+            sent_ids = self.get_sent_ids() if sent_ids is None else list(sent_ids)
+            size = max(1, round(sample * len(sent_ids))) if sent_ids else 0
+            sampled = random.Random(seed).sample(sent_ids, size)
+            # only matchings in sampled are kept, even if the backend searched the whole corpus (see _search)
+            matchings = self.search(request, clustering_parameter + clustering_keys, sent_ids=sampled)
+            res = estimate(matchings, size, len(sent_ids), confidence)
+        else:
+            sent_ids = self._restrict(request, sent_ids)
+            req = {
+                "command": "corpus_count",
+                "corpus_index": self._id,
+                **request._query(),
+                "clustering_keys": clustering_parameter + clustering_keys,
+            }
+            if sent_ids is not None:
+                req["sent_ids"] = list(sent_ids)
+            res = network.send_and_receive(req)
         if not flat:
             return res
         if clustering_parameter or clustering_keys:
             return Observation(obs=res,parameter=clustering_parameter, keys=clustering_keys)
         return res
 
+    def count_many(self, queries):
+        """
+        Count several requests in a single backend call
+        (one call per request with a backend which does not know corpus_count_many)
+        :param queries: a list of pairs (request, clustering_keys), request is a Request or a CompiledRequest
+        :return: the list of results, as given by count for each pair
+        """
+        queries = list(queries)
+        try:
+            return network.send_and_receive({
+                "command": "corpus_count_many",
+                "corpus_index": self._id,
+                "requests": [dict(request._query(), clustering_keys=keys) for request, keys in queries],
+            })
+        except GrewError:
+            return [self.count(request, clustering_keys=keys) for request, keys in queries]
+
     def __len__(self):
         return self._length
 
@@ -3,9 +3,14 @@ Grew module: anything you want to talk about graphs
 """
 import os.path
 import re
+import sys
 import copy
 import tempfile
 import json
+import hashlib
+import weakref
+from array import array
+from collections.abc import Mapping, MutableMapping
 import numpy as np
 
 from grewpy.grew import GrewError
@@ -24,7 +29,278 @@ class Fs_edge(dict):
             raise ValueError(f"data is not a feature structure {data}")
 
     def __hash__(self):
-        return (hash (str(self)))
+        return hash(frozenset(self.items()))
+
+class Frozen_edge(Fs_edge):
+    """
+    an immutable edge label
+    Labels are interned: building twice the same label returns the same object.
+    A Frozen_edge is equal to any Fs_edge (or dict) with the same features,
+    whatever their order, and its hash is computed only once.
+    Graph keeps mutable Fs_edge labels; Frozen_edge is used in sets of edges,
+    indexes and CompactGraph. A label no longer used is freed.
+    """
+    __slots__ = ("_hash",)
+    _pool = weakref.WeakValueDictionary()
+
+    def __new__(cls, data):
+        if isinstance(data, Frozen_edge):
+            return data
+        if isinstance(data, str):
+            data = {"1": data}
+        elif not isinstance(data, dict):
+            raise ValueError(f"data is not a feature structure {data}")
+        key = frozenset(data.items())
+        e = cls._pool.get(key)
+        if e is None:
+            e = dict.__new__(cls)
+            dict.update(e, sorted(data.items()))
+            e._hash = hash(key)
+            cls._pool[key] = e
+        return e
+
+    def __init__(self, data):
+        pass
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        return (Frozen_edge, (dict(self),))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("Frozen_edge is immutable, build a new one with Fs_edge or Frozen_edge")
+
+    __setitem__ = __delitem__ = __ior__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+
+class Frozen_fs(dict):
+    """
+    an immutable node feature structure, returned by CompactGraph
+    """
+    def __reduce__(self):
+        return (Frozen_fs, (dict(self),))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("this feature structure is read-only, use Graph(compact_graph) to get a modifiable graph")
+
+    __setitem__ = __delitem__ = __ior__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+
+_DELETED = object() # marks a key deleted in the private layer of a _Cow_dict
+
+class _Cow_dict(MutableMapping):
+    """
+    the node features (or successors) of a graph sharing its data with other copies
+    Values are read in a shared base (a dict, or the frozen layers of previous copies)
+    and copied in the private layer of the graph the first time they are modified.
+    Graph methods which only read use peek and peek_items: they never copy.
+    """
+    __slots__ = ("_base", "_own", "_len", "_depth")
+    _max_depth = 8 # beyond, the layers are merged in a new base
+
+    def __init__(self, base):
+        self._base = base
+        self._own = dict()
+        self._len = len(base)
+        self._depth = base._depth + 1 if isinstance(base, _Cow_dict) else 0
+
+    @classmethod
+    def share(cls, graph, field):
+        """
+        return a new _Cow_dict sharing the current content of graph.field, in constant time
+        graph.field keeps its own private layer, so that the graph stays modifiable
+        """
+        d = getattr(graph, field)
+        if not isinstance(d, _Cow_dict):
+            d = cls(d)
+            setattr(graph, field, d)
+        elif d._own:
+            # the private layer of d becomes a frozen layer, shared with the copy
+            layer = object.__new__(cls)
+            layer._base, layer._own, layer._len, layer._depth = d._base, d._own, d._len, d._depth
+            d._base, d._own, d._depth = layer, dict(), d._depth + 1
+            if d._depth > cls._max_depth:
+                d._base, d._depth = dict(d.peek_items()), 0
+        return cls(d._base)
+
+    def peek(self, k, default=None):
+        """
+        return the value of k, without copying it: it must not be modified
+        """
+        d = self
+        while isinstance(d, _Cow_dict):
+            if k in d._own:
+                v = d._own[k]
+                return default if v is _DELETED else v
+            d = d._base
+        return d.get(k, default)
+
+    def peek_items(self):
+        """
+        return the pairs (key, value) of self, without copying values: they must not be modified
+        """
+        return ((k, self.peek(k)) for k in self)
+
+    def _copy(self, v):
+        return v
+
+    def _shared(self, k, v):
+        return v
+
+    def _private(self, k):
+        """
+        return the value of k, copied first in the private layer if it is shared
+        """
+        v = self._own.get(k, _DELETED)
+        if v is _DELETED:
+            v = self.peek(k, _DELETED)
+            if v is _DELETED:
+                raise KeyError(k)
+            v = self._own[k] = self._copy(v)
+        return v
+
+    def __getitem__(self, k):
+        v = self._own.get(k, _DELETED)
+        if v is not _DELETED:
+            return v
+        if k in self._own:
+            raise KeyError(k)
+        v = self.peek(k, _DELETED)
+        if v is _DELETED:
+            raise KeyError(k)
+        return self._shared(k, v)
+
+    def __setitem__(self, k, v):
+        if k not in self:
+            self._len += 1
+        self._own[k] = v
+
+    def __delitem__(self, k):
+        if k not in self:
+            raise KeyError(k)
+        if k in self._base:
+            self._own[k] = _DELETED
+        else:
+            del self._own[k]
+        self._len -= 1
+
+    def __contains__(self, k):
+        return self.peek(k, _DELETED) is not _DELETED
+
+    def __iter__(self):
+        own, base = self._own, self._base
+        for k in base:
+            if own.get(k) is not _DELETED:
+                yield k
+        for k, v in list(own.items()):
+            if v is not _DELETED and k not in base:
+                yield k
+
+    def __len__(self):
+        return self._len
+
+    def __eq__(self, other):
+        if isinstance(other, Mapping):
+            return dict(self.peek_items()) == dict(other.items())
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(dict(self.peek_items()))
+
+    def __reduce__(self):
+        return (dict, (dict(self.peek_items()),))
+
+class _Cow_fs(MutableMapping):
+    """
+    a node feature structure shared with other copies of the graph
+    it is read in place, and copied in the graph the first time it is modified
+    """
+    __slots__ = ("_owner", "_node")
+
+    def __init__(self, owner, node):
+        self._owner = owner
+        self._node = node
+
+    def _fs(self):
+        return self._owner.peek(self._node, {})
+
+    def __getitem__(self, k):
+        return self._fs()[k]
+
+    def __setitem__(self, k, v):
+        self._owner._private(self._node)[k] = v
+
+    def __delitem__(self, k):
+        del self._owner._private(self._node)[k]
+
+    def __iter__(self):
+        return iter(self._fs())
+
+    def __len__(self):
+        return len(self._fs())
+
+    def __contains__(self, k):
+        return k in self._fs()
+
+    def copy(self):
+        return dict(self._fs())
+
+    def __repr__(self):
+        return repr(self._fs())
+
+    def __reduce__(self):
+        return (dict, (dict(self._fs()),))
+
+class _Cow_features(_Cow_dict):
+    """
+    the feature structures of a graph copy: a shared feature structure is returned as a _Cow_fs
+    """
+    __slots__ = ()
+
+    def _copy(self, fs):
+        return dict(fs) if isinstance(fs, dict) else fs
+
+    def _shared(self, n, fs):
+        return _Cow_fs(self, n) if isinstance(fs, dict) else fs
+
+class _Cow_sucs(_Cow_dict):
+    """
+    the successor lists of a graph copy
+    Edge labels may be modified in place through the lists handed out:
+    a shared list is copied (with its labels) as soon as it is accessed through the mapping interface.
+    """
+    __slots__ = ()
+
+    def _copy(self, sucs):
+        return [(m, Fs_edge(e) if isinstance(e, dict) and not isinstance(e, Frozen_edge) else e) for m, e in sucs]
+
+    def _shared(self, n, sucs):
+        return self._private(n)
+
+def _peek(d, k, default=None):
+    """
+    return d[k] without copying it, see _Cow_dict
+    """
+    return d.peek(k, default) if isinstance(d, _Cow_dict) else d.get(k, default)
+
+def _peek_items(d):
+    """
+    return the items of d without copying values, see _Cow_dict
+    """
+    return d.peek_items() if isinstance(d, _Cow_dict) else d.items()
 
 class Graph():
     """
@@ -39,16 +315,23 @@ class Graph():
         - None: return an empty graph
         - a json formatted string
         - a file name containing a json/conll
-        - a Graph: return a copy of the graph
+        - a Graph: return a copy of the graph, see `copy`
         - or named arguments: `features`, `sucs`, `meta` and `order`
     """
+    __slots__ = ("features", "_sucs", "meta", "order")
+
     def __init__(self,data=None, **kwargs):
 
-        if isinstance(data, Graph):
-            self.features = dict(data.features)
-            self._sucs = dict(data._sucs)
+        if isinstance(data, CompactGraph):
+            self.features = {n: dict(fs) if isinstance(fs, dict) else fs for n, fs in data.features.items()}
+            self._sucs = {n: [(m, Fs_edge(e)) for m, e in sucs] for n, sucs in data._sucs.items()}
+            self.meta = dict(data.meta)
+            self.order = list(data.order)
+        elif isinstance(data, Graph):
+            self.features = _Cow_features.share(data, "features")
+            self._sucs = _Cow_sucs.share(data, "_sucs")
             self.meta = dict(data.meta)
-            self.order = list(data.order)  
+            self.order = list(data.order)
         elif data is None:
             self.features = kwargs.get("features", dict())
             self.order = kwargs.get("order", [])
@@ -76,7 +359,7 @@ class Graph():
             (self.features, self.sucs, self.meta, self.order) = Graph._from_json(data_json)
         else:
             raise GrewError(f"Cannot build Graph with data of type {type(data)}")
-        assert isinstance(self.features,dict)
+        assert isinstance(self.features, (dict, _Cow_dict))
 
     @staticmethod
     def _from_json(data_json):
@@ -126,19 +409,19 @@ class Graph():
         return a string in dot/graphviz format
         """
         s = 'digraph G{\n'
-        for n,fs in self.features.items():
+        for n,fs in _peek_items(self.features):
             s += f'{n}[label="'
             label = ["%s:%s" % (f,v.replace('"','\\"')) for f, v in fs.items()]
             s += ",".join(label)
             s += '"];\n'
-        s += "\n".join([f'{n} -> {m}[label="{e}"];' for n,suc in self._sucs.items() for e,m in suc])
+        s += "\n".join([f'{n} -> {m}[label="{e}"];' for n,suc in _peek_items(self._sucs) for e,m in suc])
         return s + '\n}'
 
     def json_data(self):
-        nds = {c:self[c] for c in self.features}
+        nds = dict(_peek_items(self.features))
         edg_list = []
-        for n in self._sucs:
-            for (e,s) in self._sucs[n]:
+        for n, sucs in _peek_items(self._sucs):
+            for (e,s) in sucs:
                 if len(s.keys()) == 1 and '1' in s.keys():
                     s = s["1"]
                 edg_list.append({"src":f"{n}", "label":s,"tar":f"{e}"})
@@ -160,7 +443,14 @@ class Graph():
         """
         return the list of edges presented as triples (n,e,s) with n-[e]-> s         
         """
-        return list((n, e, s) for n in self._sucs for s,e in self._sucs[n])
+        return list((n, e, s) for n, sucs in self._sucs.items() for s,e in sucs)
+
+    def _triples(self):
+        """
+        return the triples of self, without copying the successor lists shared with copies of self
+        labels must not be modified
+        """
+        return [(n, e, s) for n, sucs in _peek_items(self._sucs) for s,e in sucs]
 
     def from_triples(self, triples):
         for n in self:
@@ -199,6 +489,121 @@ class Graph():
         return [v for (k, v) in self._sucs[n] if k == m and criterion(v)]
 
 
+    def copy(self):
+        """
+        return a copy of self
+        Node feature structures and successor lists are shared between self and the copy,
+        which both stay modifiable: a node is copied in a graph the first time it is modified there
+        (or its successor list accessed, as edge labels may be modified in place).
+        Copying takes a constant time, plus a copy of the list order.
+        """
+        return Graph(self)
+
+    def compact(self):
+        """
+        return a read-only CompactGraph with the same content
+        """
+        return CompactGraph(self)
+
+    def fingerprint(self, meta=()):
+        """
+        return a canonical hash (as an hex string) of self
+        The fingerprint covers features, edges and the meta data whose keys are in meta.
+        It does not depend on node keys: nodes in self.order are identified
+        by their position, other nodes (including the ends of edges which
+        have no feature structure) by their features and their edges.
+        """
+        def fs_key(fs):
+            return fs if fs is None or isinstance(fs, str) else sorted(fs.items())
+        feats, triples = dict(_peek_items(self.features)), self._triples()
+        known = dict.fromkeys(feats)
+        known.update((n, None) for (s, _, t) in triples for n in (s, t))
+        ordered = {n: i for i, n in enumerate(n for n in self.order if n in known)}
+        others = [n for n in known if n not in ordered]
+        if others:
+            def signature(n):
+                outs = sorted(json.dumps([sorted(e.items()), fs_key(feats.get(t))]) for (s, e, t) in triples if s == n)
+                ins = sorted(json.dumps([sorted(e.items()), fs_key(feats.get(s))]) for (s, e, t) in triples if t == n)
+                return json.dumps([fs_key(feats.get(n)), outs, ins])
+            others.sort(key=signature)
+        index = dict(ordered)
+        for n in others:
+            index[n] = len(index)
+        nodes = sorted((index[n], fs_key(feats[n])) for n in feats)
+        edges = sorted((index[s], sorted(e.items()), index[t]) for (s, e, t) in triples)
+        meta_data = sorted((k, self.meta[k]) for k in meta if k in self.meta)
+        data = json.dumps([nodes, edges, meta_data], ensure_ascii=False)
+        return hashlib.blake2b(data.encode(encoding="UTF-8"), digest_size=16).hexdigest()
+
+    def to_arrays(self, vocabularies=None, one_hot=False):
+        """
+        return a numerical view of self, as a dict with
+          - "nodes": the list of node keys, node i is self[nodes[i]]
+          - "indptr", "indices", "labels": the successor relation in CSR format:
+            edges of node i go to nodes indices[indptr[i]:indptr[i+1]]
+            with edge labels coded by labels[indptr[i]:indptr[i+1]]
+          - "features": a matrix nodes x feature names, containing
+            the code of the value of the feature for the node, -1 if absent
+          - "one_hot" (if one_hot): a scipy.sparse CSR matrix nodes x (feature, value)
+          - "vocabularies": a dict of utils.Vocabulary used for codes:
+            "labels" (edge labels), "features" (feature names),
+            "values" (feature name -> vocabulary of its values)
+            and "feature_values" (columns of "one_hot")
+        :param vocabularies: vocabularies to use and update, in order to share codes between graphs
+        """
+        arrays = Graph._to_arrays([self], vocabularies, one_hot)
+        del arrays["graph_ptr"]
+        return arrays
+
+    @staticmethod
+    def _to_arrays(graphs, vocabularies, one_hot):
+        voc = vocabularies if vocabularies is not None else dict()
+        labels = voc.setdefault("labels", utils.Vocabulary())
+        features = voc.setdefault("features", utils.Vocabulary())
+        values = voc.setdefault("values", dict())
+        nodes, graph_ptr = [], [0]
+        indptr, indices, label_ids = [0], [], []
+        rows, cols, codes = [], [], []
+        for g in graphs:
+            keys = list(g)
+            position = {n: len(nodes)+i for i, n in enumerate(keys)}
+            sucs, feats = g._sucs, g.features
+            for n in keys:
+                for m, e in _peek(sucs, n, ()):
+                    indices.append(position[m])
+                    label_ids.append(labels.code(Frozen_edge(e)))
+                indptr.append(len(indices))
+                fs = _peek(feats, n)
+                if isinstance(fs, str):
+                    fs = {"label": fs}
+                for f, v in fs.items():
+                    rows.append(position[n])
+                    cols.append(features.code(f))
+                    codes.append(values.setdefault(f, utils.Vocabulary()).code(v))
+            nodes += keys
+            graph_ptr.append(len(nodes))
+        matrix = np.full((len(nodes), len(features)), -1, dtype=np.int32)
+        matrix[rows, cols] = codes
+        arrays = {
+            "nodes": nodes,
+            "graph_ptr": np.array(graph_ptr, dtype=np.int64),
+            "indptr": np.array(indptr, dtype=np.int64),
+            "indices": np.array(indices, dtype=np.int64),
+            "labels": np.array(label_ids, dtype=np.int32),
+            "features": matrix,
+            "vocabularies": voc,
+        }
+        if one_hot:
+            from scipy.sparse import csr_matrix
+            feature_values = voc.setdefault("feature_values", utils.Vocabulary())
+            names = features.decode()
+            value_names = {f: values[f].decode() for f in values}
+            one_hot_cols = [feature_values.code((names[c], value_names[names[c]][v])) for c, v in zip(cols, codes)]
+            arrays["one_hot"] = csr_matrix(
+                (np.ones(len(rows), dtype=np.int8), (rows, one_hot_cols)),
+                shape=(len(nodes), len(feature_values)))
+        return arrays
+
     def run(self, Grs, strat="main"):
         return Grs.run(self, strat)
 
@@ -209,8 +614,8 @@ class Graph():
         """
         edge difference between two graphs
         """
-        E1 = {(m,repr(e),n) for (m,e,n) in self.triples() if edge_criterion(e)}  # set of edges as triples
-        E2 = {(m, repr(e), n) for (m, e, n) in other.triples() if edge_criterion(e)}  # set of edges as triples
+        E1 = {(m, Frozen_edge(e), n) for (m,e,n) in self._triples() if edge_criterion(e)}  # set of edges as triples
+        E2 = {(m, Frozen_edge(e), n) for (m, e, n) in other._triples() if edge_criterion(e)}  # set of edges as triples
         return np.array([len(E1 & E2), len(E1 - E2), len(E2 - E1)])
 
     def lower(self, n, m):
@@ -232,14 +637,228 @@ class Graph():
 
     def edge_diff_up_to(self, other, edge_transform=lambda e:e):
         E1 = set()
-        for m, e, n in self.triples():
+        for m, e, n in self._triples():
             et = edge_transform(e)
             if et:
                 E1.add((m,et,n))
         E2 = set()
-        for m, e, n in other.triples():
+        for m, e, n in other._triples():
             et = edge_transform(e)
             if et:
                 E2.add((m, et, n))
         return np.array([len(E1 & E2), len(E1 - E2), len(E2 - E1)])
         
+
+
+''' compact representation '''
+class _Compact_pool():
+    """
+    the values interned by a set of compact graphs (the graphs of a corpus, for instance):
+    node feature structures, edge labels (coded by ids) and tuples of node keys
+    A pool is freed with the last compact graph using it.
+    """
+    __slots__ = ("_fs", "_label_index", "labels", "_positions", "__weakref__")
+
+    def __init__(self):
+        self._fs = dict() # tuple of pairs -> Frozen_fs
+        self._label_index = dict() # edge label -> label id
+        self.labels = [] # label id -> edge label (a Frozen_edge)
+        self._positions = dict() # tuple of node keys -> dict node key -> position
+
+    def fs(self, fs):
+        """
+        return the shared (read-only) copy of the feature structure fs
+        """
+        if isinstance(fs, str):
+            return sys.intern(fs)
+        t = tuple((sys.intern(k), sys.intern(v) if isinstance(v, str) else v) for k,v in fs.items())
+        shared = self._fs.get(t)
+        if shared is None:
+            shared = self._fs[t] = Frozen_fs(t)
+        return shared
+
+    def label(self, e):
+        """
+        return the id of the edge label e in the label table
+        """
+        e = Frozen_edge(e)
+        if e not in self._label_index:
+            self._label_index[e] = len(self.labels)
+            self.labels.append(e)
+        return self._label_index[e]
+
+    def positions(self, nodes):
+        """
+        return the shared dict mapping the node keys of the tuple nodes to their position
+        """
+        position = self._positions.get(nodes)
+        if position is None:
+            position = self._positions[nodes] = {n: i for i, n in enumerate(nodes)}
+        return position
+
+_default_pool = lambda: None # weak reference to the pool of compact graphs built without pool
+
+def _shared_pool():
+    """
+    return the pool of compact graphs built without pool, created again once all of them are freed
+    """
+    global _default_pool
+    pool = _default_pool()
+    if pool is None:
+        pool = _Compact_pool()
+        _default_pool = weakref.ref(pool)
+    return pool
+
+class _Compact_view(Mapping):
+    """
+    the read-only features (or successors, if sucs) of a CompactGraph, seen as a dict
+    """
+    __slots__ = ("_graph", "_is_sucs")
+
+    def __init__(self, graph, is_sucs):
+        self._graph = graph
+        self._is_sucs = is_sucs
+
+    def __getitem__(self, n):
+        g = self._graph
+        i = g._position(n)
+        if self._is_sucs:
+            if not g._has_sucs[i]:
+                raise KeyError(n)
+            return g._sucs_of(i)
+        if i >= len(g._fs):
+            raise KeyError(n)
+        return g._fs_of(i)
+
+    def __iter__(self):
+        g = self._graph
+        if self._is_sucs:
+            return (n for i, n in enumerate(g._nodes) if g._has_sucs[i])
+        return iter(g._nodes[:len(g._fs)])
+
+    def __len__(self):
+        g = self._graph
+        return sum(g._has_sucs) if self._is_sucs else len(g._fs)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+class CompactGraph(Graph):
+    """
+    a read-only graph with a small memory footprint
+
+    Node feature structures and edge labels are interned, i.e. shared
+    between the compact graphs built with the same pool (by default, a pool shared by all
+    compact graphs built without pool, freed with them), and successors are stored in arrays.
+    It offers the reading interface of Graph; feature structures (Frozen_fs)
+    and edge labels (Frozen_edge) it returns are read-only.
+    Use Graph(compact_graph) to get back a modifiable graph.
+    """
+    __slots__ = ("_pool", "_nodes", "_positions", "_fs", "_ptr", "_tar", "_lab", "_has_sucs")
+
+    def __init__(self, data=None, pool=None, **kwargs):
+        if not isinstance(data, Graph):
+            data = Graph(data, **kwargs)
+        pool = self._pool = pool or _shared_pool()
+        nodes = list(data.features)
+        sucs = dict(_peek_items(data._sucs))
+        for n in sucs:
+            if n not in data.features:
+                nodes.append(n)
+            for m, _ in sucs[n]:
+                if m not in data.features and m not in nodes:
+                    nodes.append(m)
+        self._nodes = tuple(sys.intern(n) for n in nodes)
+        position = self._positions = pool.positions(self._nodes)
+        self._fs = tuple(pool.fs(fs) for _, fs in _peek_items(data.features))
+        self._ptr, self._tar, self._lab = array("I", [0]), array("I"), array("I")
+        for n in nodes:
+            for m, e in sucs.get(n, []):
+                self._tar.append(position[m])
+                self._lab.append(pool.label(e))
+            self._ptr.append(len(self._tar))
+        self._has_sucs = bytes(n in sucs for n in nodes)
+        self.meta = dict(data.meta)
+        self.order = tuple(sys.intern(n) for n in data.order)
+
+    def __getstate__(self):
+        # label ids are only meaningful in the pool: labels are pickled
+        labels = self._pool.labels
+        return {"nodes": self._nodes, "fs": self._fs, "ptr": self._ptr, "tar": self._tar,
+                "labels": [labels[l] for l in self._lab], "has_sucs": self._has_sucs,
+                "meta": self.meta, "order": self.order}
+
+    def __setstate__(self, state):
+        pool = self._pool = _shared_pool()
+        self._nodes = tuple(sys.intern(n) for n in state["nodes"])
+        self._positions = pool.positions(self._nodes)
+        self._fs = tuple(pool.fs(fs) for fs in state["fs"])
+        self._ptr, self._tar = state["ptr"], state["tar"]
+        self._lab = array("I", (pool.label(e) for e in state["labels"]))
+        self._has_sucs, self.meta, self.order = state["has_sucs"], state["meta"], state["order"]
+
+    @classmethod
+    def from_json(cls, data_json, pool=None):
+        (features, sucs, meta, order) = Graph._from_json(data_json)
+        return cls(features=features, sucs=sucs, order=order, meta=meta, pool=pool)
+
+    def _fs_of(self, i):
+        return self._fs[i]
+
+    def _sucs_of(self, i):
+        labels = self._pool.labels
+        return [(self._nodes[self._tar[j]], labels[self._lab[j]])
+                for j in range(self._ptr[i], self._ptr[i+1])]
+
+    def __len__(self):
+        return len(self._fs)
+
+    def _position(self, nid):
+        return self._positions[nid]
+
+    def __getitem__(self, nid):
+        i = self._position(nid)
+        if i >= len(self._fs):
+            raise KeyError(nid)
+        return self._fs_of(i)
+
+    def __iter__(self):
+        return iter(self._nodes[:len(self._fs)])
+
+    @property
+    def features(self):
+        return _Compact_view(self, False)
+
+    @property
+    def _sucs(self):
+        return _Compact_view(self, True)
+
+    sucs = property(lambda self: self._sucs, doc="successor relation (read-only)")
+
+    def copy(self):
+        return self
+
+    def compact(self):
+        return self
+
+    def triples(self):
+        return [(n, e, s) for i, n in enumerate(self._nodes) for s, e in self._sucs_of(i)]
+
+    def edges(self, n, m):
+        return [v for (k, v) in self._sucs_of(self._position(n)) if k == m]
+
+    def edges_up_to(self, n, m, criterion):
+        return [v for (k, v) in self._sucs_of(self._position(n)) if k == m and criterion(v)]
+
+    def edge(self, n, m):
+        if n in self._positions:
+            for (k, v) in self._sucs_of(self._position(n)):
+                if k == m:
+                    return v
+        return None
+
+    def edge_up_to(self, n, m, criterion):
+        if n in self._positions:
+            for k, v in self._sucs_of(self._position(n)):
+                if k == m and criterion(v):
+                    return v
@@ -25,12 +25,65 @@ class GrewError(Exception):
 
 GrewError.__doc__ = "A wrapper for grew-related errors"
 
+config = None # the last configuration given to set_config
+
 def set_config(data):
     """
     Change the configuration used in the next exchanges
     See https://grew.fr/doc/graph/#edges for details about config
     """
-    return network.send_and_receive({"command": "set_config", "config": data})
+    global config
+    reply = network.send_and_receive({"command": "set_config", "config": data})
+    config = data
+    return reply
+
+compression = None # the last arguments given to set_compression
+
+def set_compression(methods=None, threshold=1 << 16, level=3):
+    """
+    Negotiate with the backend the compression of the messages of at least threshold bytes
+    (in both directions); useful when the backend runs on another host
+    :param methods: the accepted methods, by order of preference, among "zstd" and "zlib"
+      (by default, all the methods available in python); an empty list stops compression
+    :return: the method chosen by the backend, or None if it does not support any of them
+    """
+    global compression
+    compression = dict(methods=methods, threshold=threshold, level=level)
+    available = network.compressions()
+    methods = available if methods is None else [m for m in methods if m in available]
+    network.compression = None # the negotiation itself is never compressed
+    try:
+        reply = network.send_and_receive({"command": "set_compression", "methods": methods, "threshold": threshold})
+    except GrewError:
+        return None # the backend does not know compression
+    if reply in methods:
+        network.compression, network.compression_threshold, network.compression_level = reply, threshold, level
+    return network.compression
 
 def request_counter():
     return network.request_counter
+
+_live = dict() # (kind, index) -> information about backend objects not freed yet
+
+def _register(kind, index, **info):
+    """
+    record that the backend object index of kind ("corpus", "grs" or "request") is alive
+    """
+    _live[(kind, index)] = info
+
+def _free(kind, index):
+    """
+    free the backend object index of kind ("corpus", "grs" or "request")
+    """
+    _live.pop((kind, index), None)
+    try:
+        network.send_and_receive({"command": f"{kind}_clean", f"{kind}_index": index})
+    except GrewError:
+        pass # the backend is not reachable anymore
+
+def live_objects():
+    """
+    return the list of backend objects (corpora, grs and requests) that are not freed yet,
+    with the length of corpora
+    """
+    return [dict(kind=kind, index=index, **info) for (kind, index), info in _live.items()]
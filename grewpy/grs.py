@@ -1,7 +1,16 @@
 import json
+import re
 import os.path
+import hashlib
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Mapping
+from types import MappingProxyType
+from concurrent.futures import ProcessPoolExecutor
 
 from . import network
+from . import grew
 from .grew import JSON
 from grewpy.graph import Graph
 from .corpus import Corpus, CorpusDraft, GrewError
@@ -39,9 +48,18 @@ class RequestItem():
     def __repr__(self):
         return f"{self.sort} {{{ ';'.join([str(x) for x in self.items]) }}}"
 
+def _digest(data):
+    """
+    return a stable hash (an hex string) of the json data
+    """
+    text = json.dumps(data, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(text.encode(encoding='UTF-8')).hexdigest()
+
 class Request():
     """
     lists of ClauseList
+    The json serialization and the digest of a request are computed once,
+    they are recomputed only if items are changed (by without, append...).
     """
     def __init__(self, *L):
         """
@@ -50,6 +68,9 @@ class Request():
          - (pattern) string or a
          - Request (for copies)
         """
+        if len(L) == 1 and isinstance(L[0], Request): # copy: share items and serialization
+            self._items, self._json, self._digest = L[0]._items, L[0]._json, L[0]._digest
+            return
         elts = tuple()
         for e in L:
             if isinstance(e,str):
@@ -69,6 +90,15 @@ class Request():
                     raise ValueError(f"{e} cannot be used to build a Request")
         self.items = elts
 
+    @property
+    def items(self):
+        return self._items
+
+    @items.setter
+    def items(self, elts):
+        self._items = elts
+        self._json, self._digest = None, None
+
     def without(self, *L):
         self.items += tuple(RequestItem("without", e) for e in L)
         return self
@@ -79,7 +109,35 @@ class Request():
         return cls(*elts)
 
     def json_data(self):
-        return [x.json_data() for x in self.items]
+        """
+        return the json representation of self; it is shared, do not modify it
+        """
+        if self._json is None:
+            self._json = [x.json_data() for x in self.items]
+        return self._json
+
+    def digest(self):
+        """
+        return a stable hash of the content of self (an hex string)
+        A Request can be modified (append, without): it is hashed by identity,
+        use its digest to compare or index requests by content.
+        """
+        if self._digest is None:
+            self._digest = _digest(self.json_data())
+        return self._digest
+
+    def _query(self):
+        """
+        return the fields describing self in a corpus_count/corpus_search message
+        """
+        return {"request": self.json_data()}
+
+    def compile(self):
+        """
+        register self in the backend and return the corresponding CompiledRequest
+        raise a GrewError if self is not a valid request
+        """
+        return CompiledRequest(self)
 
     def __str__(self):
         return "\n".join([str(e) for e in self.items])
@@ -107,6 +165,42 @@ class Request():
             raise ValueError(f"cannot build a clause list with {L}")
 
 
+class CompiledRequest():
+    """
+    a Request parsed once by the backend, see Request.compile
+    It can be used instead of a Request in Corpus.count and Corpus.search:
+    only its index is sent.
+    """
+    def __init__(self, request):
+        self.request = Request(request)
+        req = {"command": "load_request", "request": self.request.json_data()}
+        self.id = network.send_and_receive(req)["index"]
+        grew._register("request", self.id)
+        self._finalizer = weakref.finalize(self, grew._free, "request", self.id)
+        self._finalizer.atexit = False # the backend stops with python
+
+    def _query(self):
+        return {"request_index": self.id}
+
+    def json_data(self):
+        return self.request.json_data()
+
+    def close(self):
+        """
+        free the memory used by the request on the backend side
+        """
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __str__(self):
+        return str(self.request)
+
+
 class Command:
     def __init__(self,s):
         """
@@ -169,16 +263,66 @@ class Commands(list):
     def json_data(self):
         return [x if isinstance(x,str) else x.json_data() for x in self]
 
+def _freeze(data):
+    """
+    return a read-only version of the json data
+    """
+    if isinstance(data, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in data.items()})
+    if isinstance(data, list):
+        return tuple(_freeze(v) for v in data)
+    return data
+
+def _thaw(data):
+    """
+    return the json data given by data, possibly read-only (see _freeze)
+    """
+    if isinstance(data, Mapping):
+        return {k: _thaw(v) for k, v in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [_thaw(v) for v in data]
+    return data
+
 class Rule():
+    """
+    a request and commands, with optional lexicons
+    The json serialization is computed once and updated when the request
+    or the commands change; lexicons are read-only, they can only be replaced.
+    """
     def __init__(self, request : Request, cmd_list : Commands, lexicons =None):
         self.request = request
         self.commands = cmd_list
         self.lexicons = lexicons if lexicons else dict()
 
+    @property
+    def lexicons(self):
+        return self._lexicons
+
+    @lexicons.setter
+    def lexicons(self, lexicons):
+        self._lexicons_json = json.dumps(_thaw(lexicons))
+        self._lexicons = _freeze(json.loads(self._lexicons_json))
+        self._json, self._digest = None, None
+
     def json_data(self):
+        """
+        return the json representation of self; it is shared, do not modify it
+        """
         p = self.request.json_data()
         c = self.commands.json_data()
-        return {"request" : p, "commands" : c, "lexicons" : json.dumps(self.lexicons)}
+        if self._json is None or self._json["request"] is not p or self._json["commands"] != c:
+            self._json = {"request" : p, "commands" : c, "lexicons" : self._lexicons_json}
+            self._digest = None
+        return self._json
+
+    def digest(self):
+        """
+        return a stable hash of self (an hex string)
+        """
+        json_data = self.json_data()
+        if self._digest is None:
+            self._digest = _digest(json_data)
+        return self._digest
 
     def __str__(self):
         return f"{str(self.request)}\n{str(self.commands)}"
@@ -219,6 +363,17 @@ class Package(dict):
             elts[k] = v if isinstance(v,str) else v.json_data()
         return {"decls" : elts}
 
+    def digest(self):
+        """
+        return a stable hash of self (an hex string), built from the digests of its elements
+        """
+        h = hashlib.sha256()
+        for k in sorted(self):
+            v = self[k]
+            kind = "strat" if isinstance(v, str) else "decl"
+            h.update(f"{k}\0{kind}\0{v if isinstance(v, str) else v.digest()}\0".encode(encoding='UTF-8'))
+        return h.hexdigest()
+
     def __str__(self):
         res = [f"strat {k} {{{self[k]}}}" for k in self.strategies()] +\
             [f"package {k} {{{str(self[k])}}}" for k in self.packages()] +\
@@ -234,6 +389,17 @@ class Package(dict):
     def strategies(self):
         return filter(lambda x: isinstance(self[x], str), self.__iter__())
 
+    def all_rules(self, prefix=""):
+        """
+        return the names of the rules of self and of its sub-packages,
+        the latter prefixed by their package names (as in "package.rule")
+        """
+        for name in self:
+            if isinstance(self[name], Rule):
+                yield prefix + name
+            elif isinstance(self[name], Package):
+                yield from self[name].all_rules(f"{prefix}{name}.")
+
 
 class GRSDraft(Package):
     """
@@ -280,45 +446,308 @@ class GRSDraft(Package):
             grs[rule_name] = safe_rule
         return grs
 
+    def map_rules(self, fn, corpus, workers=1):
+        """
+        return a dict mapping each rule name to fn(rule_name, rule, corpus)
+        :param fn: a function, it must be defined at the top level of a module if workers > 1
+        :param corpus: a Corpus or a CorpusDraft
+        :param workers: number of processes; each process has its own backend
+         and its own copy of corpus; results do not depend on workers
+        """
+        rule_names = list(self.rules())
+        if workers <= 1:
+            if isinstance(corpus, CorpusDraft):
+                corpus = Corpus(corpus)
+            return {rule_name: fn(rule_name, self[rule_name], corpus) for rule_name in rule_names}
+        with _worker_pool(corpus, workers) as executor:
+            results = executor.map(_worker_call, [(fn, rule_name, self[rule_name]) for rule_name in rule_names])
+            return dict(zip(rule_names, results))
+
     def onf(self, strat_name="main"):
         self[strat_name] = f'Onf(Alt({",".join(self.rules())}))'
         return self
       
+def _run_options(dedup, limit):
+    """
+    return the optional fields of grs_run_graph/grs_run_corpus: the backend
+    keeps only distinct normal forms if "dedup", and stops after "limit" of them
+    """
+    options = {"dedup": True} if dedup else dict()
+    if limit is not None:
+        options["limit"] = limit
+    return options
+
+def _outputs(reply, dedup=False, limit=None):
+    """
+    yield the graphs of the json list reply, only distinct ones if dedup, and at most limit of them
+    """
+    seen = set()
+    for json_graph in reply:
+        if limit is not None and len(seen) >= limit:
+            return
+        graph = Graph.from_json(json_graph)
+        fp = graph.fingerprint() if dedup else len(seen)
+        if fp not in seen:
+            seen.add(fp)
+            yield graph
+
+class _GRS_cache:
+    """
+    content-addressed cache of the GRS loaded in the backend
+    It maps a content key to a backend grs index and counts the GRS objects using each index.
+    Indices released by the garbage collector are kept when unused, up to max_idle of them
+    (least recently used are freed first); indices released by GRS.close are freed at once.
+    """
+    def __init__(self, max_idle=16):
+        self.max_idle = max_idle
+        self.index = dict() # key -> grs index
+        self.users = dict() # grs index -> number of GRS objects using it
+        self.idle = OrderedDict() # key -> grs index, for unused indices
+
+    def acquire(self, key, load):
+        """
+        return the grs index associated to key, calling load() to get it if needed
+        """
+        if key in self.index:
+            index = self.index[key]
+            self.idle.pop(key, None)
+        else:
+            index = load()
+            self.index[key] = index
+        self.users[index] = self.users.get(index, 0) + 1
+        return index
+
+    def release(self, key, index, keep=True):
+        """
+        a GRS object using index is no longer used
+        if it was the last one, index is kept idle if keep, freed otherwise
+        """
+        self.users[index] -= 1
+        if self.users[index] == 0:
+            del self.users[index]
+            if keep:
+                self.idle[key] = index
+                self.evict()
+            else:
+                del self.index[key]
+                _free_grs(index)
+
+    def detach(self, key, index):
+        """
+        withdraw key from the cache if index is used by a single GRS object
+        return True in this case: this object becomes the only owner of index
+        """
+        if self.users.get(index) == 1 and self.index.get(key) == index:
+            del self.users[index]
+            del self.index[key]
+            return True
+        return False
+
+    def evict(self):
+        while len(self.idle) > self.max_idle:
+            key, index = self.idle.popitem(last=False)
+            del self.index[key]
+            _free_grs(index)
+
+    @staticmethod
+    def key(req, draft=None):
+        """
+        return the content key of a load_grs request
+        draft is the GRSDraft sent in req, if any
+        """
+        if draft is not None:
+            data = ("draft:" + draft.digest()).encode(encoding='UTF-8')
+        elif "file" in req:
+            data = b"".join(_file_keys(os.path.abspath(req["file"]), set()))
+        elif "str" in req:
+            data = ("str:" + req["str"]).encode(encoding='UTF-8')
+            data += b"".join(_used_file_keys(data, os.getcwd(), set()))
+        else:
+            data = ("json:" + json.dumps(req["json"], sort_keys=True)).encode(encoding='UTF-8')
+        config = json.dumps(grew.config, sort_keys=True).encode(encoding='UTF-8')
+        return hashlib.sha256(config + b"\0" + data).hexdigest()
+
+def _file_keys(path, seen):
+    """
+    yield the path, mtime and contents of the file path and of the files it uses (import, include,
+    lexicons...): any quoted string which is the name of a file relative to path is followed
+    """
+    seen.add(path)
+    with open(path, "rb") as f:
+        content = f.read()
+    yield f"file:{path}:{os.path.getmtime(path)}:".encode(encoding='UTF-8') + content
+    yield from _used_file_keys(content, os.path.dirname(path), seen)
+
+def _used_file_keys(content, directory, seen):
+    """
+    yield the keys of the files named by quoted strings in content, relative to directory
+    """
+    for name in re.findall(rb'"([^"\n]+)"', content):
+        other = os.path.abspath(os.path.join(directory, name.decode(encoding='UTF-8', errors='replace')))
+        if other not in seen and os.path.isfile(other):
+            yield from _file_keys(other, seen)
+
+grs_cache = _GRS_cache()
+
+def _load_grs(req):
+    """
+    send the load_grs request req and return the new grs index
+    """
+    index = network.send_and_receive(req)["index"]
+    grew._register("grs", index)
+    return index
+
+def _free_grs(index):
+    """
+    free the memory used by the grs index on the backend side
+    """
+    grew._free("grs", index)
+
+_worker_corpus = None # the corpus of a worker process, see _worker_pool
+
+def _worker_pool(corpus, workers):
+    """
+    return a pool of workers processes; each process has its own backend,
+    with the current configuration and a copy of corpus (a Corpus or a CorpusDraft)
+    """
+    draft = corpus if isinstance(corpus, CorpusDraft) else CorpusDraft(corpus)
+    return ProcessPoolExecutor(workers, initializer=_worker_init, initargs=(draft, grew.config, grew.compression))
+
+def _worker_init(draft, config, compression=None):
+    """
+    start a backend for the current worker and load the corpus in it
+    """
+    global _worker_corpus
+    grs_cache.__init__(grs_cache.max_idle) # indices of the parent backend are meaningless here
+    grew._live.clear()
+    network.init()
+    if config is not None:
+        grew.set_config(config)
+    if compression is not None:
+        grew.set_compression(**compression)
+    _worker_corpus = Corpus(draft)
+
+def _worker_call(args):
+    """
+    args = (fn, *params): return fn(*params, corpus) where corpus is the corpus of the worker
+    """
+    fn, *params = args
+    return fn(*params, _worker_corpus)
+
 class GRS:
     """
     An abstract GRS. Offers the possibility to apply rewriting.
-    The object is abstract and cannot be changed. 
-    For that, use a GRSDraft
+    The object is abstract: its rules can only be changed one by one
+    (add_rule, remove_rule, set_strategy). To visit it, use a GRSDraft
     """
 
-    def __init__(self, args):
+    def __init__(self, args, cache=True):
         """Load a grs stored in a file
         :param data: either a file name or a Grew string representation of a grs
         :or kwargs contains explicitly the parts of the grs
+        :param cache: if True, reuse the backend grs of an identical GRS (see grs_cache)
         :return: an integer index for latter reference to the grs
         :raise an error if the file was not correctly loaded
         """
+        draft = None
         if isinstance(args, str):
             if os.path.isfile(args):
                 req = {"command": "load_grs", "file": args}
             else:
                 req = {"command": "load_grs", "str": args}
         elif isinstance(args, GRSDraft):
+            draft = args
             req = {"command": "load_grs", "json": args.json_data()}
         elif isinstance(args, dict):
             """
             suppose it is a GRS style
             """
             try:
-                grs = GRSDraft(args)
-                req = {"command": "load_grs", "json": grs.json_data()}
+                draft = GRSDraft(args)
+                req = {"command": "load_grs", "json": draft.json_data()}
             except GrewError as e:
                 raise ValueError(f"cannot build a grs with {args}\n {e.message}")
         else:
             raise ValueError(f"cannot build a grs with {args}")
-    
-        reply = network.send_and_receive(req)
-        self.id = reply["index"]    
+
+        if cache:
+            self._key = _GRS_cache.key(req, draft)
+            self.id = grs_cache.acquire(self._key, lambda: _load_grs(req))
+            self._finalizer = weakref.finalize(self, grs_cache.release, self._key, self.id)
+        else:
+            self._key = None
+            self.id = _load_grs(req)
+            self._finalizer = weakref.finalize(self, _free_grs, self.id)
+        self._finalizer.atexit = False # the backend stops with python
+
+    def _own(self):
+        """
+        make sure that the backend grs self.id is used by self only, before modifying it
+        """
+        if self._key is None:
+            return
+        if grs_cache.detach(self._key, self.id):
+            self._finalizer.detach()
+        else: # shared with other GRS objects: work on a private copy
+            json_data = self.json()
+            self._finalizer()
+            self.id = _load_grs({"command": "load_grs", "json": json_data})
+        self._key = None
+        self._finalizer = weakref.finalize(self, _free_grs, self.id)
+        self._finalizer.atexit = False
+
+    def add_rule(self, name, rule):
+        """
+        add the Rule rule (or replace the existing one) with the given name
+        only the new rule is sent and compiled by the backend
+        """
+        self._own()
+        network.send_and_receive({
+            "command": "grs_add_rule",
+            "grs_index": self.id,
+            "name": name,
+            "rule": rule.json_data()
+        })
+        return self
+
+    def remove_rule(self, name):
+        """
+        remove the rule called name
+        """
+        self._own()
+        network.send_and_receive({"command": "grs_remove_rule", "grs_index": self.id, "name": name})
+        return self
+
+    def set_strategy(self, name, strat):
+        """
+        add or replace the strategy called name, strat is its Grew string representation
+        """
+        self._own()
+        network.send_and_receive({
+            "command": "grs_set_strategy",
+            "grs_index": self.id,
+            "name": name,
+            "strat": strat
+        })
+        return self
+
+    def close(self):
+        """
+        release the grs: its memory on the backend side is freed at once if no other GRS uses it
+        it is done automatically when the GRS is garbage collected, but then the grs
+        is kept for a while, to be reused by an identical GRS (see grs_cache)
+        the GRS cannot be used afterwards
+        """
+        if self._key is not None and self._finalizer.detach():
+            grs_cache.release(self._key, self.id, keep=False)
+        else:
+            self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
     def json(self):
         req = {"command": "json_grs", "grs_index": self.id}
@@ -327,34 +756,147 @@ class GRS:
     def __str__(self):
         return f"GRS({self.id})"
 
-    def run(self, data, strat="main"):
+    def run(self, data, strat="main", dedup=False, chunk_size=1000, limit=None):
         """
         run a Grs on a graph
         :param grs_data: a graph rewriting system or a Grew string representation of a grs
         :param G: the graph, either a str (in grew format) or a dict
         :param strat: the strategy (by default "main")
+        :param dedup: if True, structurally identical output graphs are returned once
+         and on a CorpusDraft, identical input graphs are rewritten only once
+        :param chunk_size: a CorpusDraft is sent to the backend by chunks of chunk_size graphs,
+         each chunk is rewritten with a single backend call
+        :param limit: if given, at most limit output graphs are kept for each input graph
         :return: the list of rewritten graphs
         """
+        if isinstance(data, Graph):
+            return list(self.run_iter(data, strat, dedup, chunk_size, limit))
+        elif isinstance(data, Corpus):
+            return dict(self.run_iter(data, strat, dedup, chunk_size, limit))
+        elif isinstance(data, CorpusDraft):
+            res = dict(self.run_iter(data, strat, dedup, chunk_size, limit))
+            return {sid: res[sid] for sid in data}
+
+    def run_iter(self, data, strat="main", dedup=False, chunk_size=1000, limit=None):
+        """
+        iterator version of run, see run for parameters
+        on a graph, yield the rewritten graphs one by one
+        on a corpus, yield pairs (sent_id, list of rewritten graphs),
+        a CorpusDraft is processed chunk by chunk
+        limit and dedup are sent to the backend, which stops rewriting a graph
+        once limit (distinct, if dedup) normal forms are found: the work, the reply
+        and the memory are bounded; they are also enforced on the Python side.
+        Output graphs are decoded only when needed: stopping the iteration early
+        avoids building the Python version of all output graphs
+        """
         if isinstance(data, Graph):
             req = {
                 "command": "grs_run_graph",
                 "graph": json.dumps(data.json_data()),
                 "grs_index": self.id,
-                "strat": strat
+                "strat": strat,
+                **_run_options(dedup, limit)
             }
             reply = network.send_and_receive(req)
-            return [Graph.from_json(s) for s in reply]
+            yield from _outputs(reply, dedup, limit)
         elif isinstance(data, Corpus):
             req = {
                 "command": "grs_run_corpus",
                 "corpus_index": data.get_id(),
                 "grs_index": self.id,
-                "strat": strat
+                "strat": strat,
+                **_run_options(dedup, limit)
             }
             reply = network.send_and_receive(req)
-            return {sid: [Graph(s) for s in L] for sid, L in reply.items() } 
+            for sid, L in reply.items():
+                yield sid, list(_outputs(L, dedup, limit))
         elif isinstance(data, CorpusDraft):
-            return {sid: self.run(g) for sid,g in data.items() } 
+            dups = data.duplicates() if dedup else dict()
+            copies = dict() # first occurrence -> its duplicates
+            for sid, first in dups.items():
+                copies.setdefault(first, []).append(sid)
+            sent_ids = [sid for sid in data if sid not in dups]
+            for i in range(0, len(sent_ids), chunk_size):
+                with Corpus({sid: dict.__getitem__(data, sid) for sid in sent_ids[i:i+chunk_size]}) as chunk:
+                    for sid, graphs in self.run_iter(chunk, strat, dedup, chunk_size, limit):
+                        yield sid, graphs
+                        for other in copies.get(sid, []):
+                            yield other, [g.copy() for g in graphs]
+
+    def profile(self, data, strat="main"):
+        """
+        run the strategy strat on a corpus (a Corpus, a CorpusDraft or a Graph) and
+        return the counters of the backend, aggregated over the corpus, as a dict
+        mapping each rule name (with its package prefix) to a dict with:
+          - "attempts": number of times the rule was tried (on input or intermediate graphs)
+          - "applications": number of successful applications
+          - "sentences": number of sentences where the rule applied at least once
+          - "time": time spent by the backend in the rule, in seconds
+        raise a GrewError if the backend fails, in particular if it does not support profiling (see benchmark_rules)
+        """
+        if isinstance(data, Graph):
+            data = CorpusDraft({"0": data})
+        if isinstance(data, CorpusDraft):
+            with Corpus(data) as corpus:
+                return self.profile(corpus, strat)
+        try:
+            reply = network.send_and_receive({
+                "command": "grs_profile_corpus",
+                "corpus_index": data.get_id(),
+                "grs_index": self.id,
+                "strat": strat
+            })
+        except GrewError as e:
+            raise GrewError({"function": "GRS.profile",
+                "message": "profiling failed: the backend may not support it (grs_profile_corpus), "
+                "GRS.benchmark_rules may be used instead", "backend": e.value})
+        if not isinstance(reply, dict) or not all(isinstance(c, dict) for c in reply.values()):
+            raise GrewError({"function": "GRS.profile", "message": f"unexpected reply of the backend: {reply}"})
+        return {rule: {
+                "attempts": int(counters.get("attempts", 0)),
+                "applications": int(counters.get("applications", 0)),
+                "sentences": int(counters.get("sentences", 0)),
+                "time": float(counters.get("time", 0)),
+            } for rule, counters in reply.items()}
+
+    def benchmark_rules(self, data, strat="main"):
+        """
+        benchmark each rule of self in isolation on a corpus (a Corpus, a CorpusDraft or a Graph)
+        This is not a profile of strat (see profile): each rule R is run alone,
+        with the strategy R (one application), on the input graphs only,
+        with one backend call per rule.
+        return a dict with:
+          - "rules": a dict mapping each rule name (with its package prefix) to a dict with:
+              - "graphs": number of input graphs (the size of the corpus)
+              - "outputs": number of output graphs
+              - "sentences": number of sentences where R applies
+              - "time": time of the call in seconds, including the transfer of output graphs
+          - "strat": the same measures for the whole strategy strat
+        """
+        if isinstance(data, Graph):
+            data = CorpusDraft({"0": data})
+        if isinstance(data, CorpusDraft):
+            with Corpus(data) as corpus:
+                return self.benchmark_rules(corpus, strat)
+        def measure(s):
+            start = time.perf_counter()
+            reply = network.send_and_receive({
+                "command": "grs_run_corpus",
+                "corpus_index": data.get_id(),
+                "grs_index": self.id,
+                "strat": s
+            })
+            return {
+                "graphs": len(reply),
+                "outputs": sum(len(L) for L in reply.values()),
+                "sentences": sum(1 for L in reply.values() if L),
+                "time": time.perf_counter() - start,
+            }
+        draft = GRSDraft(Package._from_json(self.json()["decls"]))
+        return {
+            "rules": {rule_name: measure(rule_name) for rule_name in draft.all_rules()},
+            "strat": measure(strat),
+        }
 
     def apply(self, data, strat="main", abstract=True):
         """
@@ -381,6 +923,7 @@ class GRS:
                 "strat": strat
             } # return None because inplace
             network.send_and_receive(req)
+            data._rewritten()
             return data if abstract else CorpusDraft (data)
         elif isinstance(data, CorpusDraft):
             acorpus = Corpus(data)
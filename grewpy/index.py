@@ -0,0 +1,181 @@
+"""
+Inverted index of a corpus: maps feature values and edge labels to the sentences using them.
+It is used to restrict the sentences searched by a request, see Corpus.build_index
+"""
+import os.path
+import re
+import json
+import numpy as np
+
+from .utils import Vocabulary
+
+_node_clause = re.compile(r'^\s*\w+\s*\[(.*)\]\s*$')
+_edge_clause = re.compile(r'^\s*(?:\w+\s*:\s*)?\w+\s*-\[(.*)\]->\s*\w+\s*$')
+_constraint = re.compile(r'^\s*([\w:.-]+)\s*=\s*("(?:[^"\\]|\\.)*"|[^\s"|!<>=^.]+)\s*$')
+_label = re.compile(r'^[\w-]+(:[\w-]+)*$')
+# configurations where a compact label "a:b" is the single feature 1="a:b"
+# in the others, it may be decoded in several features (prefixes like "E:" or "D:"...)
+_unsplit_configs = ('"basic"',)
+
+def _split(text):
+    """
+    split text at commas, except inside double quotes
+    """
+    return re.findall(r'(?:"(?:[^"\\]|\\.)*"|[^,"])+', text)
+
+def _feature_keys(text):
+    """
+    return the keys "feature=value" required by the body of a node clause
+    constraints which are not a single value (disjunctions, negations, regexp...) are ignored
+    """
+    keys = []
+    for c in _split(text):
+        m = _constraint.match(c)
+        if m:
+            name, value = m.groups()
+            if value.startswith('"'):
+                try:
+                    value = json.loads(value)
+                except ValueError:
+                    continue
+            keys.append(f"{name}={value}")
+    return keys
+
+def _split_label(label):
+    """
+    return the keys of a compact label "a:b", i.e. "-[1=a]->" and "-[2=b]->"
+    """
+    return [f"-[{i}={v}]->" for i, v in enumerate(label.split(":"), start=1)]
+
+def _edge_keys(text, config):
+    """
+    return the keys "-[feature=value]->" required by the label of an edge clause
+    a value with ":" is decoded by the configuration config (json): it is ignored
+    unless config is known not to decode it
+    """
+    text = text.strip()
+    if _label.match(text):
+        if ":" not in text:
+            return [f"-[1={text}]->"]
+        return [f"-[1={text}]->"] if config in _unsplit_configs else []
+    if all(_constraint.match(c) for c in _split(text)):
+        return [f"-[{k}]->" for k in _feature_keys(text) if ":" not in k]
+    return []
+
+def _json_keys(json_data):
+    """
+    return the keys of a graph given by its json data
+    """
+    keys = set()
+    for fs in json_data["nodes"].values():
+        if isinstance(fs, str):
+            fs = {"label": fs}
+        keys.update(f"{k}={v}" for k, v in fs.items())
+    for edges in json_data.get("edges", []):
+        label = edges["label"]
+        if isinstance(label, str):
+            label = {"1": label}
+        keys.update(f"-[{k}={v}]->" for k, v in label.items())
+        # a compact label "a:b" is also indexed as "1=a", "2=b", for requests giving its features
+        if ":" in str(label.get("1", "")):
+            keys.update(_split_label(label["1"]))
+    return keys
+
+class CorpusIndex():
+    """
+    an inverted index mapping keys to the sorted array of the positions of the sentences containing them
+    keys are "feature=value" for node features and "-[feature=value]->" for edge labels
+    postings are stored in csr format: the sentences of keys[k] are indices[indptr[k]:indptr[k+1]]
+    config is the grew configuration (json) the graphs were read with
+    """
+    def __init__(self, sent_ids, keys, indptr, indices, config="null"):
+        self.sent_ids = list(sent_ids)
+        self.config = config
+        self.keys = {k: i for i, k in enumerate(keys)}
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+
+    @classmethod
+    def from_json(cls, sent_ids, graphs, config="null"):
+        """
+        build the index of the json graphs, given in the order of sent_ids
+        """
+        keys = Vocabulary()
+        postings = []
+        for i, sid in enumerate(sent_ids):
+            for k in _json_keys(graphs[sid]):
+                c = keys.code(k)
+                if c == len(postings):
+                    postings.append([])
+                postings[c].append(i)
+        indptr = np.cumsum([0] + [len(p) for p in postings])
+        indices = np.fromiter((i for p in postings for i in p), dtype=np.int32, count=indptr[-1])
+        return cls(sent_ids, keys.decode(), indptr, indices, config)
+
+    def save(self, path):
+        """
+        save the index in the npz file path
+        """
+        with open(path, "wb") as f:
+            np.savez_compressed(f, sent_ids=np.array(self.sent_ids, dtype=str),
+                keys=np.array(list(self.keys), dtype=str), indptr=self.indptr, indices=self.indices,
+                config=np.array(self.config))
+
+    @classmethod
+    def load(cls, path):
+        """
+        load an index saved by save
+        """
+        with np.load(path) as data:
+            config = str(data["config"]) if "config" in data else None
+            return cls(data["sent_ids"].tolist(), data["keys"].tolist(), data["indptr"], data["indices"], config)
+
+    @staticmethod
+    def request_keys(request, config="null"):
+        """
+        return the keys required by the positive pattern clauses of the request,
+        read with the grew configuration config (json)
+        """
+        keys = []
+        for item in request.json_data():
+            for clause in item.get("pattern", []):
+                m = _node_clause.match(clause)
+                if m:
+                    keys += _feature_keys(m.group(1))
+                    continue
+                m = _edge_clause.match(clause)
+                if m:
+                    keys += _edge_keys(m.group(1), config)
+        return list(dict.fromkeys(keys))
+
+    def candidates(self, request):
+        """
+        return the list of sentence ids which may contain a matching of request
+        or None if the request has no indexed constraint
+        """
+        keys = self.request_keys(request, self.config)
+        if not keys:
+            return None
+        positions = None
+        for k in keys:
+            i = self.keys.get(k)
+            if i is None:
+                return []
+            posting = self.indices[self.indptr[i]:self.indptr[i+1]]
+            positions = posting if positions is None else np.intersect1d(positions, posting, assume_unique=True)
+        return [self.sent_ids[i] for i in positions.tolist()]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self.keys
+
+    @staticmethod
+    def default_path(files):
+        """
+        return the path of the index persisted alongside a corpus loaded from files
+        """
+        if len(files) == 1 and os.path.isfile(files[0]):
+            return files[0] + ".index.npz"
+        return None
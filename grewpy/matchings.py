@@ -1,4 +1,38 @@
+import numpy as np
+
 from .observation import Observation
+from .utils import Vocabulary
+
+def _feature_values(matchings, arg=None, flat=False, dense=False):
+    """
+    count the feature values of the nodes arg in the iterable matchings in one pass
+    see Matchings.feature_values
+    """
+    keys, values = Vocabulary(), Vocabulary()
+    key_codes, value_codes = [], []
+    for m in matchings:
+        nl = m.nodes if not arg else arg if isinstance(arg, list) else [arg]
+        for n in nl:
+            fs = m.graph[m.nodes[n]]
+            if isinstance(fs, str):
+                fs = {"label": fs}
+            for k, v in fs.items():
+                key_codes.append(keys.code((k,) if flat else (n, k)))
+                value_codes.append(values.code(v))
+    combined = np.array(key_codes, dtype=np.int64) * max(len(values), 1) + np.array(value_codes, dtype=np.int64)
+    if dense:
+        counts = np.bincount(combined, minlength=len(keys)*len(values))
+        return keys.decode(), values.decode(), counts.reshape(len(keys), len(values))
+    observation = Observation()
+    key_list, value_list = keys.decode(), values.decode()
+    codes, counts = np.unique(combined, return_counts=True)
+    for code, nb in zip(codes.tolist(), counts.tolist()):
+        key, value = divmod(code, len(values))
+        if key_list[key] not in observation:
+            observation[key_list[key]] = dict()
+        observation[key_list[key]][value_list[value]] = nb
+    return observation
+
 
 class Matching():
     """
@@ -9,27 +43,14 @@ class Matching():
         self.edges = json_data["edges"]
         self.graph = graph
 
-    def feature_values(self, arg=None, flat=False):
+    def feature_values(self, arg=None, flat=False, dense=False):
         """
         return the list of feature values of arg
         arg = None = all nodes, an explicit list of nodes, a unique node
         if flat, all values are flatten, otherwise, computation is done for each node
+        see Matchings.feature_values
         """
-        nl = self.nodes if not arg else arg if isinstance(arg, list) else [arg]
-        if flat:
-            """
-            not yet implemented
-            """
-            ...
-        else:
-            observation = Observation()
-            for n in nl:
-                n_in_g = self.nodes[n]
-                for k,v in self.graph[n_in_g].items():
-                    if (n, k) not in observation:
-                        observation[(n, k)] = dict()
-                    observation[(n, k)][v] = observation[(n, k)].get(v, 0)+1
-            return observation
+        return _feature_values([self], arg, flat, dense)
 
 
 class Matchings(dict):
@@ -38,19 +59,21 @@ class Matchings(dict):
     """
     def __init__(self, json_data, corpus):
         super().__init__()
+        graphs = corpus.get_many(line["sent_id"] for line in json_data)
         for line in json_data:
             sid = line["sent_id"]
             if sid not in self:
                 self[sid] = []
-            self[sid].append(Matching( line["matching"], 
-            corpus[sid]))
-
-    def feature_values(self, arg=None, flat=False):
-        observation = Observation()
-        for ms in self.values():
-            for m in ms: #for each matching of the sentence id
-                observation |= m.feature_values(arg,flat)
-        return observation
-
-    
+            self[sid].append(Matching( line["matching"],
+            graphs[sid]))
 
+    def feature_values(self, arg=None, flat=False, dense=False):
+        """
+        count the feature values of the nodes arg over all matchings
+        arg = None = all nodes, an explicit list of nodes, a unique node
+        return an Observation mapping (node, feature) to a dict value -> occurrences
+        if flat, nodes are merged: the Observation maps (feature,) to a dict value -> occurrences
+        if dense, return instead a triple (keys, values, counts) where counts is a
+        numpy matrix keys x values
+        """
+        return _feature_values((m for ms in self.values() for m in ms), arg, flat, dense)
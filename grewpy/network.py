@@ -7,6 +7,11 @@ import os.path
 import json
 import os
 import sys
+import zlib
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 from .grew import GrewError
 
@@ -16,9 +21,17 @@ run_backend = os.getenv("RUN_GREW_BACKEND", 'True').lower() in ('true', '1', 't'
 
 remote_ip = ''
 caml_pid = None
+caml_owner = None # pid of the python process which started the backend
 
 request_counter = 0 #number of request to caml
 
+# payload compression, negotiated with the backend by grew.set_compression
+# a compressed message has a header made of a letter for the method and 9 digits for its length
+compression = None # the method in use: None, "zlib" or "zstd"
+compression_threshold = 1 << 16 # messages shorter than this (in bytes) are not compressed
+compression_level = 3
+_headers = {"zlib": b"z", "zstd": b"Z"}
+
 import signal
 def preexec_function ():
     signal.signal(signal.SIGINT, signal.SIG_IGN)
@@ -31,16 +44,26 @@ def pid_exist(pid):
         return 0
 
 def init():
-    global port, remote_ip, caml_pid
+    """
+    start the backend, unless it is already started by the current process
+    (a child process, e.g. a worker of a multiprocessing pool, starts its own backend)
+    """
+    global port, remote_ip, caml_pid, caml_owner, compression
     if run_backend is False:
         remote_ip = socket.gethostbyname(host)
         return
 
     grewpy = "grewpy_backend"
     print("RUN_BACKEND", run_backend)
-    if not pid_exist(caml_pid):
+    if not pid_exist(caml_pid) or caml_owner != os.getpid():
         python_pid = os.getpid()
-        while (port<8898):
+        if caml_owner is not None and caml_owner != python_pid:
+            # a child process (e.g. a pool worker): its backend needs its own port
+            port = free_port()
+        caml_owner = python_pid
+        compression = None # to be negotiated again with the new backend
+        last_port = port + 10
+        while (port<last_port):
             caml = subprocess.Popen(
                 [grewpy, "--caller", str(python_pid), "--port", str(port)],
                 preexec_fn=preexec_function
@@ -57,6 +80,14 @@ def init():
         print ("Failed to connect 10 times!", file=sys.stderr)
         exit (1)
 
+def free_port():
+    """
+    return a port number that is currently free, chosen by the OS
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind((host, 0))
+        return s.getsockname()[1]
+
 def connect():
     try:
         s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -70,28 +101,72 @@ def connect():
 
 packet_size=32768
 
+def compressions():
+    """
+    return the compression methods available in this python, the preferred first
+    """
+    return (["zstd"] if zstandard else []) + ["zlib"]
+
+def _compress(data):
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=compression_level).compress(data)
+    return zlib.compress(data, compression_level)
+
+def _decompress(method, data):
+    if method == "zstd":
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    return zlib.decompress(data)
+
+def _frame(data):
+    """
+    return the header and the payload of the message data
+    a compressed payload too long for its 9 digits is sent uncompressed
+    """
+    if compression and len(data) >= compression_threshold:
+        compressed = _compress(data)
+        if len(compressed) < 10**9:
+            return _headers[compression] + b"%09d" % len(compressed), compressed
+    if len(data) >= 10**10:
+        raise GrewError(f"message too long ({len(data)} bytes)")
+    return b"%010d" % len(data), data
+
+def _recv(stocaml, size):
+    """
+    return the next size bytes received, or None if the connection is closed before
+    """
+    data = b''
+    while len(data) < size:
+        packet = stocaml.recv(size - len(data))
+        if not packet:
+            return None
+        data += packet
+    return data
+
 def send_and_receive(msg):
     global request_counter
     try:
         request_counter += 1
         stocaml = connect()
-        json_msg = json.dumps(msg).encode(encoding='UTF-8')
-        len_string = "%010d" % len(json_msg)
-        stocaml.sendall(len_string.encode(encoding='UTF-8'))
+        header, json_msg = _frame(json.dumps(msg).encode(encoding='UTF-8'))
+        stocaml.sendall(header)
 
         packet_nb = len(json_msg) // packet_size
         for i in range (packet_nb):
             stocaml.sendall(json_msg[packet_size*i:packet_size*(i+1)])
         stocaml.sendall(json_msg[packet_nb*packet_size:])
-        camltos = bytes()
-        reply_len = int(stocaml.recv(10))
-
-        camltos = b''
-        while len(camltos) < reply_len:
-            packet = stocaml.recv(reply_len - len(camltos))
-            if not packet:
-                return None
-            camltos += packet
+        header = _recv(stocaml, 10)
+        if header is None:
+            return None
+        if header[:1].isdigit():
+            camltos = _recv(stocaml, int(header))
+        else:
+            method = next((m for m, h in _headers.items() if h == header[:1]), None)
+            if method is None:
+                raise GrewError({"function": msg["command"], "message": f"unknown message header {header!r}"})
+            camltos = _recv(stocaml, int(header[1:]))
+            camltos = None if camltos is None else _decompress(method, camltos)
+        if camltos is None:
+            return None
         stocaml.close()
 
         reply = json.loads(camltos.decode(encoding='UTF-8'))
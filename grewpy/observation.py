@@ -1,7 +1,71 @@
+import sys
+from collections import Counter
+import numpy as np
+
+from .utils import Vocabulary
+
+class Counts(Counter):
+    """
+    a Counter which caches its total and its most common values
+    caches are dropped whenever the counter is modified
+    """
+    def _changed(self):
+        self._total = None
+        self._top = None
+
+    def total(self):
+        """
+        return the sum of the occurrences
+        """
+        if getattr(self, "_total", None) is None:
+            self._total = sum(self.values())
+        return self._total
+
+    def top(self, k=None):
+        """
+        return the list of the k most common (value, occurrences), the most common first
+        (all of them if k is None); it is computed with a heap of size k
+        """
+        top = getattr(self, "_top", None)
+        if top is None or (top[0] is not None and (k is None or k > top[0])):
+            top = self._top = (k, self.most_common(k))
+        return top[1] if k is None else top[1][:k]
+
+    def __setitem__(self, k, v):
+        super().__setitem__(k, v)
+        self._changed()
+
+    def __delitem__(self, k):
+        super().__delitem__(k)
+        self._changed()
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._changed()
+
+    def subtract(self, *args, **kwargs):
+        super().subtract(*args, **kwargs)
+        self._changed()
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def pop(self, *args):
+        self._changed()
+        return super().pop(*args)
+
+    def popitem(self):
+        self._changed()
+        return super().popitem()
+
+    def setdefault(self, k, default=None):
+        self._changed()
+        return super().setdefault(k, default)
 
 class Observation:
     """
-    maps a tuple of criteria to a dict mapping edge -> nb of observation
+    maps a tuple of criteria to a Counts mapping edge -> nb of observation
     """
     @staticmethod
     def flatten(obs, crit):
@@ -12,29 +76,25 @@ class Observation:
                 yield (L, obs)
             else:
                 for k in obs:
-                    yield from _flatten(obs[k], crit[1:], L + (k,))
+                    yield from _flatten(obs[k], crit[1:], L + (sys.intern(k) if isinstance(k, str) else k,))
         return {L : v for L, v in _flatten(obs, crit, tuple())}
 
     def __init__(self, **kwargs):
         if "obs" in kwargs:
-            if "parameter" in kwargs:
-                intermediate = Observation.flatten(kwargs["obs"], kwargs["parameter"])
+            intermediate = Observation.flatten(kwargs["obs"], kwargs.get("parameter", []))
             if "keys" in kwargs:
-                self.obs = {L : Observation.flatten(V, kwargs["keys"]) for L,V in intermediate.items()}
+                self.obs = {L : Counts(Observation.flatten(V, kwargs["keys"])) for L,V in intermediate.items()}
             else:
-                self.obs = intermediate
+                self.obs = {L : V if isinstance(V, Counts) else Counts(V) for L,V in intermediate.items()}
         else:
             self.obs = dict()
 
 
     def __ior__(self, other):
-        for parameter_keys in other.obs:
+        for parameter_keys, counter in other.obs.items():
             if parameter_keys not in self.obs:
-                self.obs[parameter_keys] = dict()
-            for observation_keys in other.obs[parameter_keys]:
-                if observation_keys not in self.obs[parameter_keys]:
-                    self.obs[parameter_keys][observation_keys] = 0
-                self.obs[parameter_keys][observation_keys] += other.obs[parameter_keys][observation_keys]
+                self.obs[parameter_keys] = Counts()
+            self.obs[parameter_keys].update(counter)
         return self
 
     def __iter__(self):
@@ -44,7 +104,7 @@ class Observation:
         return self.obs[k]
 
     def __setitem__(self, k, v):
-        self.obs.__setitem__(k,v)
+        self.obs.__setitem__(k, v if isinstance(v, Counts) else Counts(v))
 
     def __bool__(self):
         return bool(self.obs)
@@ -52,27 +112,53 @@ class Observation:
     def anomaly(self, L,  threshold):
         """
         L is a key within self
-        return for L an edge and its occurrence evaluation 
+        return for L the most frequent edge, its occurrence evaluation
         and number of total occurrences if beyond base_threshold
         """
-        s = sum(self.obs[L].values())
-        for x, v in self.obs[L].items():
-            if v > threshold * s and x:
+        counter = self.obs[L]
+        s = counter.total()
+        # less than 1/threshold values can be beyond threshold
+        for x, v in counter.top(int(1/threshold) + 1 if threshold > 0 else None):
+            if v <= threshold * s:
+                break
+            if x:
                 return (x,v,s)
         return None, None, None
 
-  
+    def top_k(self, L, k):
+        """
+        return the list of the k most frequent (value, occurrences) for the key L
+        """
+        return self.obs[L].top(k)
+
+
     def zipf(observation, n, k, width, ratio):
         """
-        return the list of width best features
+        return the list of width most frequent features
         if they are beyond ratio
         """
         if len(observation[(n, k)]) < 1:
             return []  # no values or 1 is not sufficient
-        values = list(observation[(n, k)].keys())
-        values.sort(reverse=True)
-        occs = sum([observation[(n, k)][v] for v in values])
-        zoccs = sum([observation[(n, k)][v] for v in values[0:width]])
+        counter = observation[(n, k)]
+        best = counter.top(width)
+        occs = counter.total()
+        zoccs = sum(occ for _, occ in best)
         if zoccs/occs > ratio:
-            return values[:width]
+            return [v for v, _ in best]
         return []
+
+    def to_matrix(self):
+        """
+        return a triple (parameters, values, counts) where counts is
+        a numpy matrix parameters x values of occurrences
+        """
+        parameters, values = list(self.obs), Vocabulary()
+        rows, cols, counts = [], [], []
+        for i, L in enumerate(parameters):
+            for x, v in self.obs[L].items():
+                rows.append(i)
+                cols.append(values.code(x))
+                counts.append(v)
+        matrix = np.zeros((len(parameters), len(values)), dtype=np.int64)
+        matrix[rows, cols] = counts
+        return parameters, values.decode(), matrix
@@ -1,4 +1,7 @@
-from .grs import Request
+from concurrent.futures import ThreadPoolExecutor
+
+from .grs import Request, _worker_pool, _worker_call
+from .observation import Observation
 class Sketch:
     def __init__(self, P, cluster_criterion, avec, without, target):
         """
@@ -20,13 +23,72 @@ class Sketch:
         search for a link X -> Y with respect to the sketch in the corpus
         we build a cluster depending on cluster criterion (e.g. X.upos, Y.upos)
         """
-        P1 = self.avec(self.P)
-        obs = corpus.count(P1, self.cluster_criterion, [self.target], True)
+        return Sketch.cluster_many({0: self}, corpus)[0]
+
+    def queries(self):
+        """
+        return the two counts needed by cluster, as (request, clustering keys) pairs:
+        with the link X -> Y, clustered by criterion and target, and without the link
+        """
+        return [(self.avec(self.P), self.cluster_criterion + [self.target]),
+                (self.without(Request(self.P)), self.cluster_criterion)]
+
+    def observation(self, with_link, without_link):
+        """
+        build the observation of cluster from the results of the two counts given by queries
+        """
+        obs = Observation(obs=with_link, parameter=self.cluster_criterion, keys=[self.target])
         if not obs:
             return obs
-        W1 = self.without(Request(self.P))
-        clus = corpus.count(W1, self.cluster_criterion, [], True)
+        clus = Observation(obs=without_link, parameter=self.cluster_criterion, keys=[])
         for L in obs:
             if L in clus:
                 obs[L][''] = clus[L][tuple()]
-        return obs
\ No newline at end of file
+        return obs
+
+    @staticmethod
+    def cluster_many(sketches, corpus):
+        """
+        sketches is a dict mapping names to sketches
+        return a dict mapping the same names to the clusters of the sketches in the corpus
+        all counts are done in a single backend call
+        """
+        names = list(sketches)
+        queries = [q for name in names for q in sketches[name].queries()]
+        results = corpus.count_many(queries)
+        return {name: sketches[name].observation(results[2*i], results[2*i+1]) for i, name in enumerate(names)}
+
+def _cluster_batch(sketches, corpus):
+    return Sketch.cluster_many(sketches, corpus)
+
+class Executor:
+    """
+    evaluates many sketches concurrently
+    Sketches are split into batches of batch_size, each batch is one cluster_many call.
+    With processes=False, batches are sent to the backend by a pool of threads,
+    otherwise, by worker processes, each with its own backend and copy of the corpus
+    (sketches must then be picklable: avec and without defined at the top level of a module).
+    """
+    def __init__(self, workers=4, processes=False, batch_size=8):
+        self.workers = workers
+        self.processes = processes
+        self.batch_size = batch_size
+
+    def cluster(self, sketches, corpus):
+        """
+        sketches is a dict mapping names to sketches
+        return a dict mapping the same names, in the same order, to their clusters in corpus
+        """
+        names = list(sketches)
+        batches = [{name: sketches[name] for name in names[i:i+self.batch_size]}
+                   for i in range(0, len(names), self.batch_size)]
+        if self.processes:
+            with _worker_pool(corpus, self.workers) as executor:
+                results = list(executor.map(_worker_call, [(_cluster_batch, batch) for batch in batches]))
+        else:
+            with ThreadPoolExecutor(self.workers) as executor:
+                results = list(executor.map(lambda batch: Sketch.cluster_many(batch, corpus), batches))
+        observations = dict()
+        for result in results:
+            observations.update(result)
+        return {name: observations[name] for name in names}
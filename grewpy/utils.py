@@ -1,6 +1,8 @@
 import re
 import math
 import json
+from collections import Counter
+from statistics import NormalDist
 
 ''' Graph utility tools '''
 
@@ -11,3 +13,56 @@ def map_append(d,k,v):
     if k not in d:
         d[k] = []
     d[k].append(v)
+
+class Vocabulary(dict):
+    """
+    maps items to integer codes 0, 1, 2... in order of first occurrence
+    """
+    def code(self, x):
+        """
+        return the code of x, adding x if needed
+        """
+        c = self.get(x)
+        if c is None:
+            c = self[x] = len(self)
+        return c
+
+    def decode(self):
+        """
+        return the list of items, the item of code i at position i
+        """
+        return list(self)
+
+class Estimate(float):
+    """
+    an approximate count, with the bounds low and high of its confidence interval
+    """
+    def __new__(cls, value, low, high):
+        e = super().__new__(cls, value)
+        e.low, e.high = low, high
+        return e
+
+    def __repr__(self):
+        return f"{float(self):.1f} [{self.low:.1f}, {self.high:.1f}]"
+
+def estimate(matchings, size, population, confidence=0.95):
+    """
+    estimate the counts of matchings in a corpus of population sentences,
+    from the matchings found in a random sample of size of its sentences
+    matchings is a list of matchings or a nested dict of lists, as given by Corpus.search
+    Sentences are sampled, not matchings: the interval uses the variance of the
+    number of matchings per sampled sentence (normal approximation at the given confidence).
+    When nothing is found, the upper bound is given by the rule of three.
+    """
+    if isinstance(matchings, dict):
+        return {k: estimate(v, size, population, confidence) for k, v in matchings.items()}
+    fraction = size / population if population else 1
+    if not matchings:
+        return Estimate(0, 0, -math.log(1 - confidence) / fraction if fraction < 1 else 0)
+    per_sentence = Counter(m["sent_id"] for m in matchings)
+    total = len(matchings)
+    mean = total / size
+    variance = (sum(c * c for c in per_sentence.values()) - size * mean * mean) / (size - 1) if size > 1 else 0
+    delta = NormalDist().inv_cdf((1 + confidence) / 2) * population * math.sqrt((1 - fraction) * max(variance, 0) / size)
+    value = total / fraction
+    return Estimate(value, max(total, value - delta), value + delta)
@@ -0,0 +1,15 @@
+"""
+Shared set up of the tests which do not need the backend
+"""
+import sys, os
+
+os.environ["RUN_GREW_BACKEND"] = "false" # no backend needed
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))  # Use local grew lib
+from grewpy import Graph
+
+def sample_graph():
+    return Graph.from_json({
+        "nodes": {"1": {"form": "le", "upos": "DET"}, "2": {"form": "chat", "upos": "NOUN"}},
+        "edges": [{"src": "2", "label": "det", "tar": "1"}],
+        "order": ["1", "2"],
+    })
@@ -0,0 +1,64 @@
+import unittest
+import pickle
+import weakref
+import gc
+
+from helpers import sample_graph
+from grewpy import Graph, CompactGraph
+from grewpy.graph import Frozen_edge, _Compact_pool
+
+class TestCompactGraph(unittest.TestCase):
+    def test_read_api(self):
+        g = sample_graph()
+        c = g.compact()
+        self.assertEqual(list(c), list(g))
+        self.assertEqual(c["2"], g["2"])
+        self.assertEqual(dict(c.features), g.features)
+        self.assertEqual(c.sucs["2"], g.sucs["2"])
+        self.assertNotIn("1", c.sucs)
+        self.assertEqual(c.edge("2", "1"), {"1": "det"})
+        self.assertEqual(c.triples(), g.triples())
+        self.assertEqual(c.fingerprint(), g.fingerprint())
+        with self.assertRaises(KeyError):
+            c["3"]
+
+    def test_read_only(self):
+        c = sample_graph().compact()
+        with self.assertRaises(TypeError):
+            c["1"]["upos"] = "PRON"
+        with self.assertRaises(TypeError):
+            c.features["1"]["upos"] = "PRON"
+        with self.assertRaises(TypeError):
+            c.sucs["2"][0][1]["2"] = "x"
+        self.assertEqual(c["1"]["upos"], "DET")
+
+    def test_back_to_graph(self):
+        c = sample_graph().compact()
+        g = Graph(c)
+        g["1"]["upos"] = "PRON"
+        g.sucs["2"][0][1]["2"] = "x"
+        self.assertEqual(c["1"]["upos"], "DET")
+        self.assertEqual(c.sucs["2"], [("1", {"1": "det"})])
+
+    def test_pools(self):
+        pool = _Compact_pool()
+        c, d = CompactGraph(sample_graph(), pool), CompactGraph(sample_graph(), pool)
+        self.assertIs(c["2"], d["2"])
+        self.assertIs(c._positions, d._positions)
+        self.assertEqual(len(pool.labels), 1)
+        pool = weakref.ref(pool)
+        del c, d
+        gc.collect()
+        self.assertIsNone(pool())
+        label = weakref.ref(Frozen_edge({"1": "unused label"}))
+        gc.collect()
+        self.assertIsNone(label())
+
+    def test_pickle(self):
+        c = sample_graph().compact()
+        d = pickle.loads(pickle.dumps(c))
+        self.assertIsInstance(d, CompactGraph)
+        self.assertEqual(d.json_data(), c.json_data())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+import math
+import statistics
+
+import helpers
+from grewpy.utils import estimate, Estimate
+
+def matchings(*sent_ids):
+    return [{"sent_id": sid, "matching": {}} for sid in sent_ids]
+
+class TestEstimate(unittest.TestCase):
+    def test_sentence_variance(self):
+        # 4 sentences sampled out of 8, with 2, 1, 0 and 0 matchings
+        e = estimate(matchings("s1", "s1", "s2"), 4, 8)
+        self.assertIsInstance(e, Estimate)
+        self.assertEqual(e, 6)
+        delta = 1.959964 * 8 * math.sqrt(0.5 * statistics.variance([2, 1, 0, 0]) / 4)
+        self.assertAlmostEqual(e.high, 6 + delta, places=4)
+        self.assertEqual(e.low, 3) # never less than the matchings found
+
+    def test_same_spread(self):
+        # same number of matchings, concentrated in one sentence: wider interval
+        spread = estimate(matchings("s1", "s2", "s3"), 10, 100)
+        concentrated = estimate(matchings("s1", "s1", "s1"), 10, 100)
+        self.assertEqual(spread, concentrated)
+        self.assertGreater(concentrated.high, spread.high)
+
+    def test_rule_of_three(self):
+        e = estimate([], 10, 100)
+        self.assertEqual((e, e.low), (0, 0))
+        self.assertAlmostEqual(e.high, -math.log(0.05) * 10)
+        full = estimate([], 100, 100)
+        self.assertEqual((full, full.low, full.high), (0, 0, 0))
+
+    def test_exhaustive(self):
+        e = estimate(matchings("s1", "s1", "s2"), 8, 8)
+        self.assertEqual((e, e.low, e.high), (3, 3, 3))
+
+    def test_nested(self):
+        e = estimate({"NOUN": {"det": matchings("s1"), "nmod": []}, "VERB": matchings("s2", "s3")}, 5, 10)
+        self.assertEqual(e["NOUN"]["det"], 2)
+        self.assertAlmostEqual(e["NOUN"]["nmod"].high, -math.log(0.05) * 2)
+        self.assertEqual(e["VERB"], 4)
+
+if __name__ == '__main__':
+    unittest.main()
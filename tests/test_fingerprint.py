@@ -0,0 +1,60 @@
+import unittest
+
+from helpers import sample_graph
+from grewpy import Graph, CorpusDraft
+
+def renamed(graph, names):
+    """
+    return a copy of graph where node keys are renamed by the dict names
+    """
+    return Graph(
+        features={names[n]: dict(graph[n]) for n in graph},
+        sucs={names[n]: [(names[m], dict(e)) for m, e in sucs] for n, sucs in graph.sucs.items()},
+        order=[names[n] for n in graph.order], meta=dict(graph.meta))
+
+class TestFingerprint(unittest.TestCase):
+    def test_renaming(self):
+        g = sample_graph()
+        self.assertEqual(renamed(g, {"1": "a", "2": "b"}).fingerprint(), g.fingerprint())
+        g["1"]["upos"] = "PRON"
+        self.assertNotEqual(renamed(g, {"1": "a", "2": "b"}).fingerprint(), sample_graph().fingerprint())
+
+    def test_unordered_nodes(self):
+        g = sample_graph()
+        g.features["x"] = {"form": "noir"}
+        g.features["y"] = {"form": "petit"}
+        g.sucs["2"] += [("x", {"1": "amod"}), ("y", {"1": "amod"})]
+        h = renamed(g, {"1": "1", "2": "2", "x": "y", "y": "x"})
+        self.assertEqual(h.fingerprint(), g.fingerprint())
+        h["x"]["form"] = "grand"
+        self.assertNotEqual(h.fingerprint(), g.fingerprint())
+
+    def test_edge_without_features(self):
+        g = sample_graph()
+        g.sucs["2"].append(("ghost", {"1": "dep"}))
+        g.sucs["ghost"] = [("1", {"1": "dep"})]
+        h = renamed(g, {"1": "1", "2": "2", "ghost": "other"})
+        self.assertEqual(h.fingerprint(), g.fingerprint())
+        self.assertNotEqual(g.fingerprint(), sample_graph().fingerprint())
+
+    def test_meta(self):
+        g, h = sample_graph(), sample_graph()
+        g.meta["text"] = "le chat"
+        self.assertEqual(g.fingerprint(), h.fingerprint())
+        self.assertNotEqual(g.fingerprint(meta=("text",)), h.fingerprint(meta=("text",)))
+
+    def test_dedup(self):
+        other = sample_graph()
+        other["2"]["form"] = "chien"
+        draft = CorpusDraft({"s1": sample_graph(), "s2": other,
+                             "s3": renamed(sample_graph(), {"1": "a", "2": "b"}), "s4": sample_graph()})
+        draft._sent_ids = ["s1", "s2", "s3", "s4"]
+        self.assertEqual(draft.duplicates(), {"s3": "s1", "s4": "s1"})
+        unique = draft.dedup()
+        self.assertEqual(unique._sent_ids, ["s1", "s2"])
+        self.assertEqual(sorted(unique), ["s1", "s2"])
+        unique["s1"]["1"]["upos"] = "PRON"
+        self.assertEqual(draft["s1"]["1"]["upos"], "DET")
+
+if __name__ == '__main__':
+    unittest.main()
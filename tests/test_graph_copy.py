@@ -0,0 +1,76 @@
+import unittest
+import pickle
+
+from helpers import sample_graph
+from grewpy import CorpusDraft
+
+class TestGraphCopy(unittest.TestCase):
+    def test_copy(self):
+        g = sample_graph()
+        h = g.copy()
+        self.assertEqual(h.json_data(), g.json_data())
+        self.assertEqual(h.features, g.features)
+        self.assertEqual(list(h), ["1", "2"])
+        self.assertEqual(len(h), 2)
+
+    def test_read_does_not_copy(self):
+        g = sample_graph()
+        h = g.copy()
+        for n in g:
+            g[n]["upos"], h[n]["upos"], h.json_data(), h.fingerprint()
+        self.assertEqual(h.features._own, {})
+        self.assertEqual(g.features._own, {})
+
+    def test_source_stays_mutable(self):
+        g = sample_graph()
+        h = g.copy()
+        g["1"]["upos"] = "PRON"
+        g.sucs["2"].append(("1", {"1": "dep"}))
+        g.sucs["2"][0][1]["2"] = "x"
+        g.sucs["1"] = [("2", {"1": "dep"})]
+        self.assertEqual(g["1"]["upos"], "PRON")
+        self.assertEqual(g.sucs["2"][0][1], {"1": "det", "2": "x"})
+        self.assertEqual(len(g.sucs["2"]), 2)
+        self.assertEqual(h["1"]["upos"], "DET")
+        self.assertEqual(h.sucs["2"], [("1", {"1": "det"})])
+        self.assertNotIn("1", h.sucs)
+
+    def test_copy_is_mutable(self):
+        g = sample_graph()
+        h = g.copy()
+        h["1"]["upos"] = "PRON"
+        h.sucs["2"][0][1]["1"] = "dep"
+        del h.features["2"]
+        self.assertEqual(g["1"]["upos"], "DET")
+        self.assertEqual(g.edge("2", "1"), {"1": "det"})
+        self.assertIn("2", g.features)
+        self.assertEqual(list(h), ["1"])
+
+    def test_copy_of_copy(self):
+        g = sample_graph()
+        copies = [g]
+        for i in range(20):
+            copies.append(copies[-1].copy())
+            copies[-1]["1"]["form"] = str(i)
+        self.assertEqual([c["1"]["form"] for c in copies], ["le"] + [str(i) for i in range(20)])
+        self.assertEqual(copies[-1]["2"]["form"], "chat")
+
+    def test_pickle(self):
+        h = sample_graph().copy()
+        h["1"]["upos"] = "PRON"
+        k = pickle.loads(pickle.dumps(h))
+        self.assertEqual(k.json_data(), h.json_data())
+
+    def test_corpus_draft(self):
+        draft = CorpusDraft({"s1": sample_graph(), "s2": sample_graph()})
+        draft._sent_ids = ["s1", "s2"]
+        clone = CorpusDraft(draft)
+        clone["s1"]["2"]["upos"] = "VERB"
+        draft["s2"]["2"]["upos"] = "ADJ"
+        clone._sent_ids.reverse()
+        self.assertEqual(draft["s1"]["2"]["upos"], "NOUN")
+        self.assertEqual(clone["s2"]["2"]["upos"], "NOUN")
+        self.assertEqual(draft._sent_ids, ["s1", "s2"])
+
+if __name__ == '__main__':
+    unittest.main()
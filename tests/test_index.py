@@ -0,0 +1,63 @@
+import unittest
+import os
+import tempfile
+
+import helpers
+from grewpy import Request
+from grewpy.index import CorpusIndex
+
+graphs = {
+    "s1": {"nodes": {"1": {"upos": "ADV", "lemma": "faire"}, "2": {"upos": "NOUN", "lemma": "a,b"}},
+           "edges": [{"src": "1", "label": {"1": "nsubj", "2": "pass"}, "tar": "2"}]},
+    "s2": {"nodes": {"1": {"upos": "ADV", "lemma": "être"}, "2": {"upos": "VERB"}},
+           "edges": [{"src": "2", "label": "nsubj:pass", "tar": "1"}]},
+    "s3": {"nodes": {"1": {"upos": "NOUN"}, "2": {"upos": "VERB"}},
+           "edges": [{"src": "2", "label": "obj", "tar": "1"}]},
+}
+
+class TestIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = CorpusIndex.from_json(list(graphs), graphs)
+
+    def test_request_keys(self):
+        keys = CorpusIndex.request_keys
+        self.assertEqual(keys(Request("X[upos=ADV]")), ["upos=ADV"])
+        self.assertEqual(keys(Request('X[lemma="a,b", upos=NOUN]')), ["lemma=a,b", "upos=NOUN"])
+        self.assertEqual(keys(Request("X -[obj]-> Y")), ["-[1=obj]->"])
+        self.assertEqual(keys(Request("X -[nsubj:pass]-> Y")), [])
+        self.assertEqual(keys(Request("X -[E:nsubj]-> Y"), '"ud"'), [])
+        self.assertEqual(keys(Request("X -[nsubj:pass]-> Y"), '"basic"'), ["-[1=nsubj:pass]->"])
+        self.assertEqual(keys(Request("e: X -[1=nsubj, 2=pass]-> Y")), ["-[1=nsubj]->", "-[2=pass]->"])
+        self.assertEqual(keys(Request("X[upos=ADV|NOUN]")), [])
+        self.assertEqual(keys(Request("X[upos<>ADV]")), [])
+        self.assertEqual(keys(Request('X[lemma=re"f.*"]')), [])
+        self.assertEqual(keys(Request("X[upos=lex.x]")), [])
+        self.assertEqual(keys(Request("X -[^obj]-> Y")), [])
+        self.assertEqual(keys(Request("X -[1=nsubj:pass]-> Y")), [])
+        self.assertEqual(keys(Request("X[]").without("X[upos=ADV]")), [])
+
+    def test_candidates(self):
+        candidates = self.index.candidates
+        self.assertEqual(candidates(Request("X[upos=ADV]")), ["s1", "s2"])
+        self.assertEqual(candidates(Request('X[lemma="faire"]')), ["s1"])
+        self.assertIsNone(candidates(Request("X -[nsubj:pass]-> Y")))
+        self.assertEqual(candidates(Request("X -[1=nsubj, 2=pass]-> Y")), ["s1", "s2"])
+        self.assertEqual(candidates(Request("X[upos=VERB]; X -[obj]-> Y")), ["s3"])
+        self.assertEqual(candidates(Request("X[upos=PRON]")), [])
+        self.assertIsNone(candidates(Request("X[upos=ADV|NOUN]")))
+
+    def test_unsplit_config(self):
+        index = CorpusIndex.from_json(list(graphs), graphs, '"basic"')
+        self.assertEqual(index.candidates(Request("X -[nsubj:pass]-> Y")), ["s2"])
+
+    def test_save_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "index.npz")
+            CorpusIndex.from_json(list(graphs), graphs, '{"config": "ud"}').save(path)
+            index = CorpusIndex.load(path)
+        self.assertEqual(index.config, '{"config": "ud"}')
+        self.assertEqual(index.sent_ids, list(graphs))
+        self.assertEqual(index.candidates(Request("X[upos=NOUN]")), ["s1", "s3"])
+
+if __name__ == '__main__':
+    unittest.main()